@@ -1,5 +1,6 @@
 import models.user
 import models.job
+import models.cache
 import asyncio
 from logging.config import fileConfig
 
@@ -0,0 +1,146 @@
+import math
+import asyncio
+
+from celery import Celery
+from kombu import Queue
+from weakref import WeakKeyDictionary
+from amqp.exceptions import MessageNacked
+from typing import Sequence
+from prometheus_client import Histogram
+from core.settings import get_settings
+
+settings = get_settings()
+
+celery_client: Celery | None = None
+
+# Pooled channels outlive a single publish, and so does their confirm state.
+confirm_trackers: WeakKeyDictionary = WeakKeyDictionary()
+
+task_publish_seconds = Histogram(
+    "pixelforge_task_publish_seconds",
+    "Time spent publishing a set of tasks to the broker",
+    ["task_name"],
+)
+
+
+def get_celery() -> Celery:
+    global celery_client
+    if celery_client is None:
+        celery_client = Celery(broker=settings.celery_broker_url.unicode_string())
+        celery_client.conf.broker_pool_limit = settings.celery_broker_pool_limit
+        # Confirms are awaited once per batch in publish_tasks; the transport
+        # option would block on the broker after every single message.
+        celery_client.conf.broker_transport_options = {"confirm_publish": False}
+        celery_client.conf.task_queues = [
+            Queue(
+                name,
+                routing_key=name,
+                queue_arguments={"x-max-priority": settings.conversion_queue_max_priority},
+            )
+            for name in (settings.conversion_small_queue, settings.conversion_large_queue)
+        ]
+    return celery_client
+
+
+def close_celery():
+    global celery_client
+    if celery_client is not None:
+        celery_client.close()
+        celery_client = None
+
+
+def get_conversion_route(
+    input_size_bytes: int | None,
+    original_format: str | None,
+    target_format: str,
+    pixels: int | None = None,
+) -> dict:
+    size = input_size_bytes or 0
+    large_formats = {fmt.strip() for fmt in settings.conversion_large_formats.split(",") if fmt.strip()}
+
+    # A small file can still decode to a huge canvas, so the pixel count from
+    # the header weighs in as well as the byte size.
+    if (
+        size > settings.conversion_small_max_bytes
+        or (pixels or 0) > settings.conversion_small_max_pixels
+        or {original_format, target_format} & large_formats
+    ):
+        queue = settings.conversion_large_queue
+    else:
+        queue = settings.conversion_small_queue
+
+    # Every doubling past the base size drops one priority step, so within a
+    # queue the smallest files are picked up first.
+    steps = int(math.log2(max(size, 1) / settings.conversion_priority_base_bytes)) if size else 0
+    priority = max(0, min(settings.conversion_queue_max_priority, settings.conversion_queue_max_priority - steps))
+
+    return {"queue": queue, "routing_key": queue, "priority": priority}
+
+
+class ConfirmTracker:
+    """Counts publishes and broker acks on one confirm-mode channel."""
+
+    def __init__(self, channel):
+        self.published = 0
+        self.acked = 0
+        self.nacked = False
+
+        channel.events["basic_ack"].add(self.on_ack)
+        channel.events["basic_nack"].add(self.on_nack)
+        channel.confirm_select()
+
+    def on_ack(self, delivery_tag: int, multiple: bool):
+        self.acked = max(self.acked, delivery_tag)
+
+    def on_nack(self, delivery_tag: int, multiple: bool):
+        self.nacked = True
+        self.on_ack(delivery_tag, multiple)
+
+
+def get_confirm_tracker(channel) -> ConfirmTracker | None:
+    if not settings.celery_confirm_publish or not hasattr(channel, "confirm_select"):
+        return None
+
+    if channel not in confirm_trackers:
+        confirm_trackers[channel] = ConfirmTracker(channel)
+
+    return confirm_trackers[channel]
+
+
+def wait_for_confirms(channel, tracker: ConfirmTracker):
+    # Delivery tags number the channel's publishes from 1 and the broker may
+    # ack several with one frame, so this drains until the last tag sent.
+    while tracker.acked < tracker.published:
+        channel.connection.drain_events(timeout=settings.celery_confirm_timeout_seconds)
+
+    if tracker.nacked:
+        tracker.nacked = False
+        raise MessageNacked()
+
+
+def publish_tasks(name: str, args_list: Sequence[list], **options):
+    app = get_celery()
+
+    # A single pooled producer (and channel) publishes the whole set. With
+    # publisher confirms enabled, every message goes out first and the acks
+    # are awaited together, so a batch waits on the broker once rather than
+    # once per task.
+    with task_publish_seconds.labels(task_name=name).time():
+        with app.producer_or_acquire() as producer:
+            for args in args_list:
+                tracker = get_confirm_tracker(producer.channel)
+                app.send_task(name, args=args, producer=producer, **options)
+
+                if tracker:
+                    tracker.published += 1
+
+            if tracker := get_confirm_tracker(producer.channel):
+                wait_for_confirms(producer.channel, tracker)
+
+
+async def dispatch_tasks(name: str, args_list: Sequence[list], **options):
+    await asyncio.to_thread(publish_tasks, name, args_list, **options)
+
+
+async def dispatch_task(name: str, args: list, **options):
+    await dispatch_tasks(name, [args], **options)
@@ -0,0 +1,65 @@
+import json
+import time
+import hashlib
+
+from typing import IO
+from sqlalchemy import update
+from sqlalchemy.sql import func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.redis import get_redis
+from models.cache import ConversionCache
+
+CACHE_KEY_PREFIX = "conversion_cache:"
+CACHE_LRU_KEY = "conversion_cache:lru"
+CACHE_BYTES_KEY = "conversion_cache:bytes"
+
+
+def conversion_cache_key(input_sha256: str, target_format: str, options: dict | None = None) -> str:
+    encoded_options = json.dumps(options or {}, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(f"{input_sha256}:{target_format}:{encoded_options}".encode()).hexdigest()
+
+
+def hash_file(file: IO[bytes]) -> str:
+    file.seek(0)
+    digest = hashlib.file_digest(file, "sha256").hexdigest()
+    file.seek(0)
+    return digest
+
+
+async def lookup_conversion(db: AsyncSession, key: str) -> dict | None:
+    r = await get_redis()
+    entry = await r.hgetall(f"{CACHE_KEY_PREFIX}{key}")
+
+    if entry:
+        await r.zadd(CACHE_LRU_KEY, {key: time.time()})
+        return entry
+
+    # Redis is the hot index, Postgres the durable one: after a Redis restart
+    # entries are rebuilt from the table on first use.
+    row = await db.get(ConversionCache, key)
+
+    if row is None:
+        return None
+
+    entry = {
+        "input_path": row.input_path,
+        "output_path": row.output_path,
+        "output_size_bytes": str(row.output_size_bytes or 0),
+        "preview_sizes": row.preview_sizes or "",
+    }
+
+    if await r.hset(f"{CACHE_KEY_PREFIX}{key}", mapping=entry):
+        await r.incrby(CACHE_BYTES_KEY, row.output_size_bytes or 0)
+
+    await r.zadd(CACHE_LRU_KEY, {key: time.time()})
+
+    return entry
+
+
+async def touch_conversion(db: AsyncSession, key: str):
+    await db.execute(
+        update(ConversionCache)
+        .where(ConversionCache.key == key)
+        .values(hits=ConversionCache.hits + 1, last_used_at=func.now())
+    )
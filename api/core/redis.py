@@ -0,0 +1,13 @@
+import redis.asyncio as redis
+from core.settings import get_settings
+
+settings = get_settings()
+
+redis_client: redis.Redis | None = None
+
+
+async def get_redis() -> redis.Redis:
+    global redis_client
+    if redis_client is None:
+        redis_client = redis.from_url(settings.redis_url, decode_responses=True)
+    return redis_client
@@ -0,0 +1,263 @@
+import json
+import math
+import time
+import asyncio
+
+from typing import Sequence
+from fastapi import HTTPException, status
+from prometheus_client import Counter
+from redis.exceptions import RedisError
+
+from core.redis import get_redis
+from core.settings import get_settings
+from core.broker import dispatch_tasks, get_conversion_route
+
+settings = get_settings()
+
+RATE_LIMIT_PREFIX = "user_rate_limit:"
+JOB_LEASES_PREFIX = "user_job_leases:"
+PARKED_JOBS_PREFIX = "user_parked_jobs:"
+PARKED_USERS_KEY = "scheduling_parked_users"
+
+submissions_rejected = Counter(
+    "pixelforge_submissions_rejected_total",
+    "Conversion submissions rejected by per-user limits",
+    ["reason"],
+)
+
+dispatch_failures = Counter(
+    "pixelforge_dispatch_failures_total",
+    "Admitted conversions put back in the parked list because publishing failed",
+)
+
+# Refills the bucket for the time elapsed since the last call and takes
+# `cost` tokens if they are there. Returns the seconds until they would be,
+# as a string because Lua numbers are truncated to integers on the way out.
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+
+local retry_after = 0
+if tokens >= cost then
+    tokens = tokens - cost
+else
+    retry_after = (cost - tokens) / rate
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+
+return tostring(retry_after)
+"""
+
+# Every admitted job holds a lease in the user's sorted set, scored by when
+# it expires. Expired leases are dropped before counting, so a slot held by
+# a worker that died or a publish that never happened frees itself instead
+# of leaking. Parked jobs take free slots in order; the caller dispatches
+# whatever the script returns. The worker runs the same steps on release.
+PROMOTE_SCRIPT = """
+local user_id = ARGV[1]
+local limit = tonumber(ARGV[2])
+local lease = tonumber(ARGV[3])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local dispatch = {}
+
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+
+local function lease_job(entry)
+    redis.call('ZADD', KEYS[1], now + lease, cjson.decode(entry)['job_id'])
+    table.insert(dispatch, entry)
+end
+
+local function promote_parked()
+    while redis.call('ZCARD', KEYS[1]) < limit do
+        local entry = redis.call('LPOP', KEYS[2])
+        if not entry then
+            break
+        end
+        lease_job(entry)
+    end
+end
+
+local function finish()
+    if redis.call('EXISTS', KEYS[2]) == 1 then
+        redis.call('SADD', KEYS[3], user_id)
+    else
+        redis.call('SREM', KEYS[3], user_id)
+    end
+    if redis.call('EXISTS', KEYS[1]) == 1 then
+        redis.call('EXPIRE', KEYS[1], math.ceil(lease))
+    end
+    return dispatch
+end
+"""
+
+# New jobs only take a slot when nothing older is parked, so each user has
+# at most `limit` tasks in the broker and users interleave there.
+ADMIT_SCRIPT = PROMOTE_SCRIPT + """
+promote_parked()
+
+for i = 4, #ARGV do
+    if redis.call('LLEN', KEYS[2]) == 0 and redis.call('ZCARD', KEYS[1]) < limit then
+        lease_job(ARGV[i])
+    else
+        redis.call('RPUSH', KEYS[2], ARGV[i])
+    end
+end
+
+return finish()
+"""
+
+SWEEP_SCRIPT = PROMOTE_SCRIPT + """
+promote_parked()
+
+return finish()
+"""
+
+# Puts entries that could not be published back at the head of the parked
+# list, in order, and drops their leases.
+REPARK_SCRIPT = """
+for i = #ARGV, 2, -1 do
+    redis.call('LPUSH', KEYS[2], ARGV[i])
+    redis.call('ZREM', KEYS[1], cjson.decode(ARGV[i])['job_id'])
+end
+
+redis.call('SADD', KEYS[3], ARGV[1])
+"""
+
+
+def get_scheduling_keys(user_id: int) -> tuple[str, str, str]:
+    return f"{JOB_LEASES_PREFIX}{user_id}", f"{PARKED_JOBS_PREFIX}{user_id}", PARKED_USERS_KEY
+
+
+async def get_queue_depth(user_id: int) -> tuple[int, int]:
+    r = await get_redis()
+
+    pipe = r.pipeline(transaction=False)
+    pipe.zcount(f"{JOB_LEASES_PREFIX}{user_id}", f"({time.time()}", "+inf")
+    pipe.llen(f"{PARKED_JOBS_PREFIX}{user_id}")
+    active, parked = await pipe.execute()
+
+    return active, parked
+
+
+async def enforce_submission_limits(user_id: int, count: int = 1):
+    active, parked = await get_queue_depth(user_id)
+
+    if active + parked + count > settings.user_max_queued_jobs:
+        submissions_rejected.labels(reason="queue_depth").inc()
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=f"Too many queued conversions, the limit is {settings.user_max_queued_jobs}",
+            headers={"Retry-After": str(settings.user_queue_retry_after_seconds)},
+        )
+
+    r = await get_redis()
+
+    # A request larger than the burst could never be satisfied, so it drains
+    # the whole bucket instead.
+    retry_after = float(await r.eval(
+        TOKEN_BUCKET_SCRIPT,
+        1,
+        f"{RATE_LIMIT_PREFIX}{user_id}",
+        settings.user_rate_limit_per_second,
+        settings.user_rate_limit_burst,
+        min(count, settings.user_rate_limit_burst),
+    ))
+
+    if retry_after > 0:
+        submissions_rejected.labels(reason="rate_limit").inc()
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Conversion rate limit exceeded",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+
+
+async def schedule_conversions(user_id: int, jobs: Sequence):
+    entries = [
+        {
+            "job_id": job.id,
+            **get_conversion_route(
+                job.input_size_bytes,
+                job.original_format,
+                job.target_format,
+                job.width * job.height if job.width and job.height else None,
+            ),
+        }
+        for job in jobs
+    ]
+
+    r = await get_redis()
+    keys = get_scheduling_keys(user_id)
+
+    admitted = await r.eval(
+        ADMIT_SCRIPT,
+        len(keys),
+        *keys,
+        user_id,
+        settings.user_max_active_jobs,
+        settings.user_job_lease_seconds,
+        *(json.dumps(entry) for entry in entries),
+    )
+
+    await dispatch_entries(user_id, admitted)
+
+
+async def dispatch_entries(user_id: int, admitted: Sequence[str]):
+    routes = {}
+
+    for entry in map(json.loads, admitted):
+        job_id = entry.pop("job_id")
+        routes.setdefault(tuple(entry.items()), []).append([job_id])
+
+    # The jobs are already committed, so a failed publish parks them again
+    # for the sweep to retry rather than failing the request. A job that did
+    # get published before the failure is skipped by the worker the second
+    # time, as it is no longer pending.
+    try:
+        await asyncio.gather(*(
+            dispatch_tasks("convert_image", args_list, **dict(route))
+            for route, args_list in routes.items()
+        ))
+    except Exception:
+        dispatch_failures.inc(len(admitted))
+        r = await get_redis()
+        keys = get_scheduling_keys(user_id)
+        await r.eval(REPARK_SCRIPT, len(keys), *keys, user_id, *admitted)
+
+
+async def scheduling_sweeper():
+    r = await get_redis()
+
+    # Parked jobs normally move when one of the user's jobs finishes. This
+    # picks up users whose slots only came free by a lease expiring.
+    while True:
+        await asyncio.sleep(settings.user_scheduling_sweep_seconds)
+
+        try:
+            for user_id in await r.smembers(PARKED_USERS_KEY):
+                keys = get_scheduling_keys(user_id)
+                admitted = await r.eval(
+                    SWEEP_SCRIPT,
+                    len(keys),
+                    *keys,
+                    user_id,
+                    settings.user_max_active_jobs,
+                    settings.user_job_lease_seconds,
+                )
+
+                if admitted:
+                    await dispatch_entries(user_id, admitted)
+        except RedisError:
+            continue
@@ -1,22 +1,95 @@
+import time
+import asyncio
+
 from jose import jwt
+from typing import Callable, TypeVar
 from core.settings import get_settings
 from passlib.context import CryptContext
+from fastapi import HTTPException, status
 from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor
+from prometheus_client import Counter, Gauge, Histogram
 
 settings = get_settings()
 
+T = TypeVar("T")
+
 pwd_context = CryptContext(
     schemes=["bcrypt"],
     deprecated="auto",
 )
 
+# bcrypt releases the GIL while hashing, so a small dedicated pool keeps the
+# event loop free and caps how many CPU-heavy hashes run at once.
+password_executor = ThreadPoolExecutor(
+    max_workers=settings.password_hash_workers,
+    thread_name_prefix="password",
+)
+
+password_hash_pending = Gauge(
+    "pixelforge_password_hash_pending",
+    "Password hash/verify calls queued or running",
+)
+
+password_hash_wait_seconds = Histogram(
+    "pixelforge_password_hash_wait_seconds",
+    "Time password hash/verify calls wait for a free worker",
+)
+
+password_hash_seconds = Histogram(
+    "pixelforge_password_hash_seconds",
+    "Time spent hashing or verifying a password",
+)
+
+password_hash_rejected = Counter(
+    "pixelforge_password_hash_rejected_total",
+    "Password hash/verify calls rejected because the queue was full",
+)
+
+pending_password_tasks = 0
+
+
+def run_timed(func: Callable[..., T], queued_at: float, *args) -> T:
+    password_hash_wait_seconds.observe(time.perf_counter() - queued_at)
+
+    with password_hash_seconds.time():
+        return func(*args)
+
+
+async def run_password_task(func: Callable[..., T], *args) -> T:
+    global pending_password_tasks
+
+    if pending_password_tasks >= settings.password_hash_queue_limit:
+        password_hash_rejected.inc()
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many concurrent authentication requests, retry shortly",
+            headers={"Retry-After": "1"},
+        )
+
+    pending_password_tasks += 1
+    password_hash_pending.inc()
+
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            password_executor,
+            run_timed,
+            func,
+            time.perf_counter(),
+            *args,
+        )
+    finally:
+        pending_password_tasks -= 1
+        password_hash_pending.dec()
+
 
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+async def verify_password(plain_password, hashed_password):
+    return await run_password_task(pwd_context.verify, plain_password, hashed_password)
 
 
-def get_password_hash(password):
-    return pwd_context.hash(password)
+async def get_password_hash(password):
+    return await run_password_task(pwd_context.hash, password)
 
 
 def create_access_token(
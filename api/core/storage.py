@@ -1,17 +1,29 @@
 import boto3
+import asyncio
 
+from functools import partial
 from botocore.client import Config
 from core.settings import get_settings
+from boto3.s3.transfer import TransferConfig
+from typing import IO, AsyncGenerator, Callable, TypeVar
+from concurrent.futures import ThreadPoolExecutor
 
 settings = get_settings()
 
+T = TypeVar("T")
+
+storage_config = Config(
+    signature_version="s3v4",
+    max_pool_connections=settings.storage_max_pool_connections,
+)
+
 storage_client = boto3.client(
     "s3",
     endpoint_url=settings.storage_endpoint,
     aws_access_key_id=settings.storage_access_key,
     aws_secret_access_key=settings.storage_secret_key,
     region_name=settings.storage_region,
-    config=Config(signature_version="s3v4"),
+    config=storage_config,
 )
 
 public_storage_client = boto3.client(
@@ -20,7 +32,20 @@ public_storage_client = boto3.client(
     aws_access_key_id=settings.storage_access_key,
     aws_secret_access_key=settings.storage_secret_key,
     region_name=settings.storage_region,
-    config=Config(signature_version="s3v4"),
+    config=storage_config,
+)
+
+# boto3 is blocking, so every call made from a request handler runs on this
+# pool; its size is the cap on concurrent storage calls per API process.
+storage_executor = ThreadPoolExecutor(
+    max_workers=settings.storage_max_concurrency,
+    thread_name_prefix="storage",
+)
+
+transfer_config = TransferConfig(
+    multipart_threshold=settings.storage_multipart_threshold_bytes,
+    multipart_chunksize=settings.storage_multipart_chunk_bytes,
+    max_concurrency=settings.storage_transfer_concurrency,
 )
 
 def create_bucket_if_not_exists(bucket_name: str):
@@ -29,3 +54,93 @@ def create_bucket_if_not_exists(bucket_name: str):
     if not any(bucket['Name'] == bucket_name for bucket in existing_buckets.get('Buckets', [])):
         storage_client.create_bucket(Bucket=bucket_name)
 
+
+async def run_storage(func: Callable[..., T], *args, **kwargs) -> T:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(storage_executor, partial(func, *args, **kwargs))
+
+
+async def upload_fileobj(
+    file: IO[bytes],
+    bucket: str,
+    key: str,
+    content_type: str | None = None,
+):
+    await run_storage(
+        storage_client.upload_fileobj,
+        Fileobj=file,
+        Bucket=bucket,
+        Key=key,
+        ExtraArgs={"ContentType": content_type} if content_type else None,
+        Config=transfer_config,
+    )
+
+
+async def download_fileobj(bucket: str, key: str, file: IO[bytes]):
+    await run_storage(
+        storage_client.download_fileobj,
+        Bucket=bucket,
+        Key=key,
+        Fileobj=file,
+        Config=transfer_config,
+    )
+
+
+async def head_object(bucket: str, key: str) -> dict:
+    return await run_storage(storage_client.head_object, Bucket=bucket, Key=key)
+
+
+def generate_presigned_upload_url(bucket: str, key: str, content_type: str | None = None) -> str:
+    params = {"Bucket": bucket, "Key": key}
+
+    if content_type:
+        params["ContentType"] = content_type
+
+    return public_storage_client.generate_presigned_url(
+        "put_object",
+        Params=params,
+        ExpiresIn=settings.storage_presigned_url_ttl_seconds,
+    )
+
+
+def generate_presigned_download_url(
+    bucket: str,
+    key: str,
+    filename: str,
+    media_type: str,
+    disposition: str = "attachment",
+) -> str:
+    return public_storage_client.generate_presigned_url(
+        "get_object",
+        Params={
+            "Bucket": bucket,
+            "Key": key,
+            "ResponseContentType": media_type,
+            "ResponseContentDisposition": f'{disposition}; filename="{filename}"',
+        },
+        ExpiresIn=settings.storage_presigned_url_ttl_seconds,
+    )
+
+
+async def get_object(bucket: str, key: str, **kwargs) -> dict:
+    return await run_storage(storage_client.get_object, Bucket=bucket, Key=key, **kwargs)
+
+
+def get_stream_chunk_size(content_length: int) -> int:
+    # Each chunk costs one hop to the storage pool, so large objects are read
+    # in bigger pieces while small ones still start streaming quickly.
+    return max(
+        settings.storage_stream_min_chunk_bytes,
+        min(
+            settings.storage_stream_max_chunk_bytes,
+            content_length // settings.storage_stream_target_chunks,
+        ),
+    )
+
+
+async def iter_object_body(body, chunk_size: int) -> AsyncGenerator[bytes, None]:
+    try:
+        while chunk := await run_storage(body.read, chunk_size):
+            yield chunk
+    finally:
+        body.close()
@@ -0,0 +1,115 @@
+import json
+import time
+import asyncio
+
+from datetime import datetime
+from collections import OrderedDict
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+
+from models.user import User
+from core.redis import get_redis
+from core.settings import get_settings
+
+settings = get_settings()
+
+USER_CACHE_PREFIX = "user_cache:"
+USER_INVALIDATION_CHANNEL = "users_channel"
+
+local_cache: OrderedDict[str, tuple[float, User]] = OrderedDict()
+
+
+def serialize_user(user: User) -> dict:
+    return {
+        "id": user.id,
+        "username": user.username,
+        "email": user.email,
+        "created_at": user.created_at.isoformat() if user.created_at else None,
+    }
+
+
+def build_user(data: dict) -> User:
+    # A transient, read-only copy: it is never attached to a session and
+    # carries no password hash.
+    return User(
+        id=data["id"],
+        username=data["username"],
+        email=data["email"],
+        created_at=datetime.fromisoformat(data["created_at"]) if data["created_at"] else None,
+    )
+
+
+def remember_local(email: str, user: User):
+    local_cache[email] = (time.monotonic() + settings.user_cache_local_ttl_seconds, user)
+    local_cache.move_to_end(email)
+
+    while len(local_cache) > settings.user_cache_local_max_size:
+        local_cache.popitem(last=False)
+
+
+async def get_cached_user(email: str) -> User | None:
+    if entry := local_cache.get(email):
+        expires_at, user = entry
+
+        if expires_at > time.monotonic():
+            local_cache.move_to_end(email)
+            return user
+
+        del local_cache[email]
+
+    r = await get_redis()
+
+    if raw := await r.get(f"{USER_CACHE_PREFIX}{email}"):
+        user = build_user(json.loads(raw))
+        remember_local(email, user)
+        return user
+
+    return None
+
+
+async def cache_user(user: User):
+    r = await get_redis()
+    data = serialize_user(user)
+
+    await r.set(
+        f"{USER_CACHE_PREFIX}{user.email}",
+        json.dumps(data),
+        ex=settings.user_cache_ttl_seconds,
+    )
+    remember_local(user.email, build_user(data))
+
+
+async def invalidate_user(email: str):
+    local_cache.pop(email, None)
+
+    r = await get_redis()
+    await r.delete(f"{USER_CACHE_PREFIX}{email}")
+    await r.publish(USER_INVALIDATION_CHANNEL, email)
+
+
+async def user_invalidation_listener():
+    r = await get_redis()
+    pubsub = r.pubsub()
+    await pubsub.subscribe(USER_INVALIDATION_CHANNEL)
+
+    async for msg in pubsub.listen():
+        if msg["type"] == "message":
+            local_cache.pop(msg["data"], None)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def mark_user_changed(mapper, connection, target: User):
+    session = object_session(target)
+    emails = session.info.setdefault("changed_user_emails", set())
+    emails.add(target.email)
+    emails.update(inspect(target).attrs.email.history.deleted)
+
+
+@event.listens_for(Session, "after_commit")
+def invalidate_changed_users(session: Session):
+    if emails := session.info.pop("changed_user_emails", None):
+        loop = asyncio.get_running_loop()
+
+        for email in emails:
+            loop.create_task(invalidate_user(email))
@@ -19,6 +19,9 @@ from routes.format import router as format_router
 from routes.ws.job import router as ws_job_router
 
 from core.settings import get_settings
+from core.user_cache import user_invalidation_listener
+from core.scheduling import scheduling_sweeper
+from core.broker import get_celery, close_celery
 from core.storage import create_bucket_if_not_exists
 
 settings = get_settings()
@@ -32,13 +35,19 @@ async def lifespan(app: FastAPI):
         await conn.run_sync(Base.metadata.create_all)
 
     asyncio.create_task(broadcast_listener())
+    asyncio.create_task(user_invalidation_listener())
+    asyncio.create_task(scheduling_sweeper())
     create_bucket_if_not_exists(settings.storage_upload_bucket)
     create_bucket_if_not_exists(settings.storage_converted_bucket)
 
+    get_celery()
+
     instrumentator.expose(app)
 
     yield
 
+    close_celery()
+
 
 app = FastAPI(
     title=settings.app_name,
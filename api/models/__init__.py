@@ -1,2 +1,3 @@
 from models.job import Job
-from models.user import User
\ No newline at end of file
+from models.user import User
+from models.cache import ConversionCache
\ No newline at end of file
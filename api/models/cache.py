@@ -0,0 +1,19 @@
+from core.db import Base
+from sqlalchemy.sql import func
+from sqlalchemy import Column, Integer, String, DateTime
+
+
+class ConversionCache(Base):
+    __tablename__ = "conversion_cache"
+
+    key = Column(String(64), primary_key=True)
+    input_sha256 = Column(String(64), nullable=False, index=True)
+    target_format = Column(String, nullable=False)
+    options = Column(String, nullable=False, default="{}")
+    input_path = Column(String, nullable=False)
+    output_path = Column(String, nullable=False)
+    output_size_bytes = Column(Integer, nullable=True)
+    preview_sizes = Column(String, nullable=True)
+    hits = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_used_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -2,24 +2,44 @@ from core.db import Base
 from sqlalchemy.sql import func
 from schemas.job import JobStatus
 from sqlalchemy.orm import relationship
-from sqlalchemy import Column, Integer, String, Enum, DateTime, ForeignKey
+from sqlalchemy import JSON, Boolean, Column, Integer, String, Enum, DateTime, ForeignKey, Index, false, text
 
 
 class Job(Base):
     __tablename__ = "jobs"
+    __table_args__ = (
+        Index("ix_jobs_user_id_id", "user_id", "id"),
+        Index("ix_jobs_user_id_status_id", "user_id", "status", "id"),
+        # Cache hits point at the upload of the job they were served from,
+        # so only the job that owns an upload is held to one per path.
+        Index(
+            "uq_jobs_input_path",
+            "input_path",
+            unique=True,
+            postgresql_where=text("NOT cache_hit"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     filename = Column(String, nullable=False)
     input_path = Column(String, nullable=False)
+    input_sha256 = Column(String(64), nullable=True, index=True)
     output_path = Column(String, nullable=True)
     input_size_bytes = Column(Integer, nullable=True)
     output_size_bytes = Column(Integer, nullable=True)
+    preview_sizes = Column(String, nullable=True)
+    options = Column(JSON(none_as_null=True), nullable=True)
     original_format = Column(String, nullable=True)
+    width = Column(Integer, nullable=True)
+    height = Column(Integer, nullable=True)
+    mode = Column(String, nullable=True)
     target_format = Column(String, nullable=False)
     status = Column(Enum(JobStatus), nullable=False, default=JobStatus.PENDING, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     started_at = Column(DateTime(timezone=True), nullable=True)
     finished_at = Column(DateTime(timezone=True), nullable=True)
+    batch_id = Column(String, nullable=True, index=True)
+    cache_hit = Column(Boolean, nullable=False, default=False, server_default=false())
 
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     user = relationship("User", back_populates="jobs")
\ No newline at end of file
@@ -37,7 +37,7 @@ async def register(
     new_user = User(
         username=user.username,
         email=user.email,
-        password=get_password_hash(user.password)
+        password=await get_password_hash(user.password)
     )
 
     db.add(new_user)
@@ -55,7 +55,7 @@ async def authenticate_user(
     result = await db.execute(select(User).where(User.email == email))
     user = result.scalars().one_or_none()
 
-    if not user or not verify_password(password, user.password):
+    if not user or not await verify_password(password, user.password):
         return False
 
     return user
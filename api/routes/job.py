@@ -1,18 +1,49 @@
-from typing import Generator
+from typing import Callable, Generator, IO, List, NamedTuple
+import os
 import uuid
+import asyncio
+import zipfile
+import mimetypes
 
-from celery import Celery
-from sqlalchemy import select
+from io import BytesIO
+from functools import partial
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from sqlalchemy import func, insert, select
+from sqlalchemy.exc import IntegrityError
 from botocore.exceptions import ClientError
-from fastapi.responses import StreamingResponse
+from fastapi.responses import RedirectResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response, UploadFile
 
 from core.db import get_db
-from utils.pagination import paginate
+from core.cache import (
+    hash_file,
+    touch_conversion,
+    lookup_conversion,
+    conversion_cache_key,
+)
+from core.scheduling import (
+    get_queue_depth,
+    schedule_conversions,
+    enforce_submission_limits,
+)
+from utils.pagination import paginate, paginate_cursor
 from core.settings import get_settings
-from core.storage import storage_client
+from core.storage import (
+    storage_client,
+    get_object,
+    head_object,
+    download_fileobj,
+    upload_fileobj,
+    iter_object_body,
+    get_stream_chunk_size,
+    generate_presigned_upload_url,
+    generate_presigned_download_url,
+)
 from utils.dependencies import get_current_user
+from utils.image import ImageHeader, read_image_header
+from utils.status import job_status_from_job, read_cached_statuses
 
 from models.job import (
     Job,
@@ -22,7 +53,15 @@ from models.job import (
 from schemas.job import (
     JobCreate,
     JobRead,
+    JobFinalize,
+    JobStatusQuery,
+    JobStatusRead,
+    JobQueueRead,
+    JobBatchCreate,
+    JobBatchRead,
     JobImageExtension,
+    JobUploadUrlCreate,
+    JobUploadUrlRead,
 )
 
 from schemas.pagination import (
@@ -34,6 +73,233 @@ settings = get_settings()
 
 router = APIRouter(tags=["job"])
 
+ZIP_CONTENT_TYPES = ("application/zip", "application/x-zip-compressed")
+TRAILING_HEADER_EXTENSIONS = ("tif", "tiff")
+
+
+class BatchEntry(NamedTuple):
+    filename: str
+    ext: str
+    size: int
+    content_type: str | None
+    open: Callable[[], IO[bytes]]
+
+
+def get_file_extension(filename: str) -> str:
+    return filename.split(".")[-1].lower()
+
+
+def validate_input_extension(ext: str, target_format: JobImageExtension):
+    if not JobImageExtension.has_value(ext):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported input file format, supported formats: {', '.join(JobImageExtension.list_values())}"
+        )
+
+    if target_format.value == ext:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="target_format must be different from the input file format"
+        )
+
+
+def get_upload_size(file: IO[bytes]) -> int:
+    file.seek(0, 2)
+    size = file.tell()
+    file.seek(0)
+    return size
+
+
+def collect_batch_entries(
+    files: List[UploadFile],
+    target_format: JobImageExtension,
+) -> List[BatchEntry]:
+    entries = []
+
+    for upload in files:
+        ext = get_file_extension(upload.filename)
+
+        if ext != "zip" and upload.content_type not in ZIP_CONTENT_TYPES:
+            validate_input_extension(ext, target_format)
+            entries.append(BatchEntry(
+                filename=upload.filename,
+                ext=ext,
+                size=get_upload_size(upload.file),
+                content_type=upload.content_type,
+                open=lambda file=upload.file: file,
+            ))
+            continue
+
+        try:
+            archive = zipfile.ZipFile(upload.file)
+        except zipfile.BadZipFile:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid zip archive: {upload.filename}"
+            )
+
+        members = archive.infolist()
+
+        if len(members) > settings.batch_max_archive_members:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Archive exceeds the limit of {settings.batch_max_archive_members} members: {upload.filename}"
+            )
+
+        # Archives usually carry folders and OS metadata files, so members
+        # that are not convertible images are skipped instead of rejected.
+        for member in members:
+            name = os.path.basename(member.filename)
+            member_ext = get_file_extension(name)
+
+            if (
+                member.is_dir()
+                or name.startswith(".")
+                or not JobImageExtension.has_value(member_ext)
+                or member_ext == target_format.value
+            ):
+                continue
+
+            entries.append(BatchEntry(
+                filename=name,
+                ext=member_ext,
+                size=member.file_size,
+                content_type=mimetypes.guess_type(name)[0],
+                open=partial(archive.open, member),
+            ))
+
+    # Sizes come from the archive directory, so a zip bomb is turned away
+    # before any member is inflated.
+    if sum(entry.size for entry in entries) > settings.batch_max_uncompressed_bytes:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Batch exceeds the limit of {settings.batch_max_uncompressed_bytes} bytes uncompressed"
+        )
+
+    return entries
+
+
+async def create_pending_job(
+    db: AsyncSession,
+    user_id: int,
+    filename: str,
+    input_path: str,
+    input_size_bytes: int,
+    ext: str,
+    target_format: JobImageExtension,
+    input_sha256: str | None = None,
+    options: dict | None = None,
+    header: ImageHeader | None = None,
+) -> Job:
+    job = Job(
+        filename=filename,
+        input_path=input_path,
+        input_sha256=input_sha256,
+        input_size_bytes=input_size_bytes,
+        original_format=ext,
+        width=header.width if header else None,
+        height=header.height if header else None,
+        mode=header.mode if header else None,
+        user_id=user_id,
+        target_format=target_format.value,
+        options=options,
+        status=JobStatus.PENDING,
+    )
+
+    db.add(job)
+
+    await db.commit()
+    await db.refresh(job)
+
+    await schedule_conversions(user_id, [job])
+
+    return job
+
+
+async def create_cached_job(
+    db: AsyncSession,
+    user_id: int,
+    filename: str,
+    input_sha256: str,
+    input_size_bytes: int,
+    ext: str,
+    target_format: JobImageExtension,
+    cache_key: str,
+    cached: dict,
+    options: dict | None = None,
+    header: ImageHeader | None = None,
+) -> Job:
+    now = datetime.now(timezone.utc)
+
+    # Identical bytes were already uploaded and converted, so the new job
+    # points at the existing objects and is never dispatched.
+    job = Job(
+        filename=filename,
+        input_path=cached["input_path"],
+        input_sha256=input_sha256,
+        input_size_bytes=input_size_bytes,
+        output_path=cached["output_path"],
+        output_size_bytes=int(cached["output_size_bytes"]),
+        preview_sizes=cached.get("preview_sizes") or None,
+        original_format=ext,
+        width=header.width if header else None,
+        height=header.height if header else None,
+        mode=header.mode if header else None,
+        user_id=user_id,
+        target_format=target_format.value,
+        options=options,
+        status=JobStatus.SUCCESS,
+        started_at=now,
+        finished_at=now,
+        cache_hit=True,
+    )
+
+    db.add(job)
+    await touch_conversion(db, cache_key)
+
+    await db.commit()
+    await db.refresh(job)
+
+    return job
+
+
+def read_batch_entry_header(entry: BatchEntry) -> ImageHeader:
+    file = entry.open()
+
+    try:
+        return read_image_header(file)
+    except HTTPException as e:
+        raise HTTPException(status_code=e.status_code, detail=f"{entry.filename}: {e.detail}")
+    finally:
+        # Archive members get a fresh handle per open, plain uploads are
+        # reused by the upload step.
+        if isinstance(file, zipfile.ZipExtFile):
+            file.close()
+
+
+async def upload_batch_entry(entry: BatchEntry, input_path: str):
+    with entry.open() as file:
+        await upload_fileobj(
+            file,
+            bucket=settings.storage_upload_bucket,
+            key=input_path,
+            content_type=entry.content_type,
+        )
+
+
+async def get_batch_jobs(db: AsyncSession, batch_id: str, user_id: int) -> List[Job]:
+    result = await db.execute(
+        select(Job)
+        .where(Job.batch_id == batch_id, Job.user_id == user_id)
+        .order_by(Job.id)
+    )
+    jobs = result.scalars().all()
+
+    if not jobs:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Batch not found")
+
+    return jobs
+
 @router.get(
     "/",
     response_model=PaginatedResponse[JobRead],
@@ -43,7 +309,7 @@ async def list_jobs(
     db: AsyncSession = Depends(get_db),
     user=Depends(get_current_user),
     pagination: PaginationParams = Depends(),
-    status: JobStatus | None = None,
+    job_status: JobStatus | None = Query(None, alias="status"),
 ) -> PaginatedResponse[JobRead]:
     if not user:
         raise HTTPException(
@@ -53,8 +319,19 @@ async def list_jobs(
 
     query = select(Job).where(Job.user_id == user.id).order_by(Job.id.desc())
 
-    if status:
-        query = query.where(Job.status == status)
+    if job_status:
+        query = query.where(Job.status == job_status)
+
+    if pagination.cursor is not None:
+        return await paginate_cursor(
+            db=db,
+            model=Job,
+            base_query=query,
+            cursor=pagination.cursor,
+            size=pagination.size,
+            request=request,
+            count_mode=pagination.count,
+        )
 
     result = await paginate(
         db=db,
@@ -63,6 +340,8 @@ async def list_jobs(
         page=pagination.page,
         size=pagination.size,
         request=request,
+        count_mode=pagination.count,
+        with_cursor=True,
     )
 
 
@@ -89,7 +368,73 @@ async def create_job(
             detail="target_format required"
         )
 
-    ext = schema.file.filename.split(".")[-1].lower()
+    ext = get_file_extension(schema.file.filename)
+    validate_input_extension(ext, schema.target_format)
+
+    filename = f"{uuid.uuid4().hex}.{ext}"
+
+    file = schema.file.file
+    content_bytes_size = get_upload_size(file)
+    header = await asyncio.to_thread(read_image_header, file)
+    input_sha256 = await asyncio.to_thread(hash_file, file)
+    options = schema.options.to_dict()
+
+    if settings.conversion_cache_enabled:
+        cache_key = conversion_cache_key(input_sha256, schema.target_format.value, options)
+
+        if cached := await lookup_conversion(db, cache_key):
+            return await create_cached_job(
+                db=db,
+                user_id=user.id,
+                filename=schema.file.filename,
+                input_sha256=input_sha256,
+                input_size_bytes=content_bytes_size,
+                ext=ext,
+                target_format=schema.target_format,
+                cache_key=cache_key,
+                cached=cached,
+                options=options,
+                header=header,
+            )
+
+    await enforce_submission_limits(user.id)
+
+    await upload_fileobj(
+        file,
+        bucket=settings.storage_upload_bucket,
+        key=filename,
+        content_type=schema.file.content_type,
+    )
+
+    return await create_pending_job(
+        db=db,
+        user_id=user.id,
+        filename=schema.file.filename,
+        input_path=filename,
+        input_size_bytes=content_bytes_size,
+        ext=ext,
+        target_format=schema.target_format,
+        input_sha256=input_sha256,
+        options=options,
+        header=header,
+    )
+
+
+@router.post(
+    "/upload-url",
+    response_model=JobUploadUrlRead,
+)
+async def create_upload_url(
+    schema: JobUploadUrlCreate,
+    user=Depends(get_current_user),
+) -> JobUploadUrlRead:
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Authentication required"
+        )
+
+    ext = get_file_extension(schema.filename)
 
     if not JobImageExtension.has_value(ext):
         raise HTTPException(
@@ -97,48 +442,392 @@ async def create_job(
             detail=f"Unsupported input file format, supported formats: {', '.join(JobImageExtension.list_values())}"
         )
 
-    if schema.target_format.value == ext:
+    await enforce_submission_limits(user.id)
+
+    # Keys are namespaced by user so finalize can reject foreign uploads.
+    input_path = f"{user.id}/{uuid.uuid4().hex}.{ext}"
+
+    return JobUploadUrlRead(
+        upload_url=generate_presigned_upload_url(
+            settings.storage_upload_bucket,
+            input_path,
+            schema.content_type,
+        ),
+        input_path=input_path,
+        expires_in=settings.storage_presigned_url_ttl_seconds,
+    )
+
+
+async def read_upload_header(key: str, ext: str, prefix: bytes, size: int) -> ImageHeader:
+    # The first bytes are enough for most headers, but a TIFF may put its IFD
+    # after the strips. Only those get a second, bounded read of the whole
+    # object; anything else that does not parse fails on the prefix alone.
+    try:
+        return read_image_header(BytesIO(prefix), verify=False)
+    except HTTPException as exc:
+        if (
+            exc.status_code != status.HTTP_422_UNPROCESSABLE_ENTITY
+            or ext not in TRAILING_HEADER_EXTENSIONS
+            or len(prefix) >= size
+            or size > settings.upload_spool_max_bytes
+        ):
+            raise
+
+    file = BytesIO()
+
+    try:
+        await download_fileobj(settings.storage_upload_bucket, key, file)
+    except ClientError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Upload not found"
+        )
+
+    return await asyncio.to_thread(read_image_header, file)
+
+
+@router.post(
+    "/convert/finalize",
+    response_model=JobRead,
+)
+async def finalize_job(
+    schema: JobFinalize,
+    db: AsyncSession = Depends(get_db),
+    user=Depends(get_current_user),
+) -> JobRead:
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Authentication required"
+        )
+
+    if not schema.input_path.startswith(f"{user.id}/"):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Upload not found"
+        )
+
+    ext = get_file_extension(schema.input_path)
+    validate_input_extension(ext, schema.target_format)
+
+    # Finalizing is idempotent: a retry gets the job the first call created.
+    existing_query = select(Job).where(Job.input_path == schema.input_path, Job.cache_hit.is_(False))
+
+    if existing := await db.scalar(existing_query):
+        return existing
+
+    try:
+        head = await head_object(settings.storage_upload_bucket, schema.input_path)
+    except ClientError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Upload not found"
+        )
+
+    # A presigned PUT is not size-checked on the way in, so an oversized
+    # object is turned away before any of it is read.
+    if head["ContentLength"] > settings.upload_max_bytes:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Upload exceeds the limit of {settings.upload_max_bytes} bytes"
+        )
+
+    try:
+        obj = await get_object(
+            settings.storage_upload_bucket,
+            schema.input_path,
+            Range=f"bytes=0-{settings.upload_sniff_bytes - 1}",
+        )
+        prefix = await asyncio.to_thread(obj["Body"].read)
+    except ClientError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Upload not found"
+        )
+
+    header = await read_upload_header(schema.input_path, ext, prefix, head["ContentLength"])
+
+    # A concurrent finalize of the same upload can pass the check above; the
+    # unique index on the path lets only one insert through.
+    try:
+        return await create_pending_job(
+            db=db,
+            user_id=user.id,
+            filename=schema.filename,
+            input_path=schema.input_path,
+            input_size_bytes=head["ContentLength"],
+            ext=ext,
+            target_format=schema.target_format,
+            options=schema.options.to_dict(),
+            header=header,
+        )
+    except IntegrityError:
+        await db.rollback()
+        return await db.scalar(existing_query)
+
+
+@router.post(
+    "/convert/batch",
+    response_model=JobBatchRead,
+)
+async def create_batch(
+    schema: JobBatchCreate = Depends(JobBatchCreate.as_form),
+    db: AsyncSession = Depends(get_db),
+    user=Depends(get_current_user),
+) -> JobBatchRead:
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Authentication required"
+        )
+
+    entries = await asyncio.to_thread(collect_batch_entries, schema.files, schema.target_format)
+
+    if not entries:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="target_format must be different from the input file format"
+            detail="No convertible files in batch"
         )
 
-    filename = f"{uuid.uuid4().hex}.{ext}"
-    celery_client = Celery(broker=settings.celery_broker_url.unicode_string())
+    if len(entries) > settings.batch_max_files:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Batch exceeds the limit of {settings.batch_max_files} files"
+        )
 
-    file = schema.file.file
-    file.seek(0, 2)
-    content_bytes_size = file.tell()
-    file.seek(0)
+    headers = await asyncio.to_thread(lambda: [read_batch_entry_header(entry) for entry in entries])
+
+    await enforce_submission_limits(user.id, len(entries))
+
+    batch_id = uuid.uuid4().hex
+    input_paths = [f"{uuid.uuid4().hex}.{entry.ext}" for entry in entries]
+
+    await asyncio.gather(*(
+        upload_batch_entry(entry, input_path)
+        for entry, input_path in zip(entries, input_paths)
+    ))
+
+    rows = []
 
-    storage_client.put_object(
-        Bucket=settings.storage_upload_bucket,
-        Key=filename,
-        Body=file,
-        ContentType=schema.file.content_type,
+    for entry, input_path, header in zip(entries, input_paths, headers):
+        rows.append({
+            "filename": entry.filename,
+            "input_path": input_path,
+            "input_size_bytes": entry.size,
+            "original_format": entry.ext,
+            "width": header.width,
+            "height": header.height,
+            "mode": header.mode,
+            "user_id": user.id,
+            "target_format": schema.target_format.value,
+            "options": schema.options.to_dict(),
+            "status": JobStatus.PENDING,
+            "batch_id": batch_id,
+        })
+
+    result = await db.scalars(
+        insert(Job).returning(Job, sort_by_parameter_order=True),
+        rows,
     )
+    jobs = result.all()
 
-    job = Job(
-        filename=schema.file.filename,
-        input_path=filename,
-        input_size_bytes=content_bytes_size,
-        original_format=ext,
-        user_id=user.id,
-        target_format=schema.target_format.value,
-        status=JobStatus.PENDING,
+    await db.commit()
+
+    await schedule_conversions(user.id, jobs)
+
+    return JobBatchRead(
+        batch_id=batch_id,
+        total=len(jobs),
+        pending=len(jobs),
+        processing=0,
+        success=0,
+        failed=0,
+        jobs=jobs,
     )
 
-    db.add(job)
 
-    await db.commit()
-    await db.refresh(job)
+@router.get(
+    "/queue",
+    response_model=JobQueueRead,
+)
+async def get_queue(
+    user=Depends(get_current_user),
+) -> JobQueueRead:
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Authentication required"
+        )
+
+    active, parked = await get_queue_depth(user.id)
 
-    celery_client.send_task(
-        "convert_image",
-        args=[job.id],
+    return JobQueueRead(
+        active=active,
+        parked=parked,
+        max_active=settings.user_max_active_jobs,
+        max_queued=settings.user_max_queued_jobs,
     )
 
-    return job
+
+@router.get(
+    "/batch/{batch_id}",
+    response_model=JobBatchRead,
+)
+async def get_batch(
+    batch_id: str,
+    db: AsyncSession = Depends(get_db),
+    user=Depends(get_current_user),
+) -> JobBatchRead:
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Authentication required"
+        )
+
+    jobs = await get_batch_jobs(db, batch_id, user.id)
+
+    def count(job_status: JobStatus) -> int:
+        return sum(1 for job in jobs if job.status == job_status)
+
+    return JobBatchRead(
+        batch_id=batch_id,
+        total=len(jobs),
+        pending=count(JobStatus.PENDING),
+        processing=count(JobStatus.PROCESSING),
+        success=count(JobStatus.SUCCESS),
+        failed=count(JobStatus.FAILED),
+        jobs=jobs,
+    )
+
+
+@router.post(
+    "/status",
+    response_model=List[JobStatusRead],
+)
+async def get_statuses(
+    schema: JobStatusQuery,
+    db: AsyncSession = Depends(get_db),
+    user=Depends(get_current_user),
+) -> List[JobStatusRead]:
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Authentication required"
+        )
+
+    if not schema.ids and not schema.since:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="ids or since required"
+        )
+
+    if schema.ids and len(schema.ids) > settings.job_status_batch_max:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.job_status_batch_max} ids per request"
+        )
+
+    since = schema.since
+
+    if since and since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+
+    statuses = {}
+    query = select(Job).where(Job.user_id == user.id)
+
+    if schema.ids:
+        # The worker keeps the latest status of every active job in Redis,
+        # so Postgres is only asked for the ids Redis does not know about.
+        statuses = await read_cached_statuses(list(set(schema.ids)), user.id)
+        missing = set(schema.ids) - statuses.keys()
+
+        if missing:
+            query = query.where(Job.id.in_(missing))
+        else:
+            query = None
+    else:
+        updated_at = func.coalesce(Job.finished_at, Job.started_at, Job.created_at)
+        query = query.where(updated_at > since).order_by(updated_at).limit(settings.job_status_batch_max)
+
+    if query is not None:
+        for job in (await db.execute(query)).scalars():
+            statuses[job.id] = job_status_from_job(job)
+
+    results = statuses.values()
+
+    if since:
+        results = [job_status for job_status in results if job_status.updated_at > since]
+
+    return sorted(results, key=lambda job_status: job_status.id)
+
+
+class ArchiveStream:
+    """Write-only file that hands back what the zip writer produced so far."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data: bytes) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def stream_batch_archive(jobs: List[Job]) -> Generator[bytes, None, None]:
+    # The stream cannot seek, so zipfile writes each entry's sizes after its
+    # data and the archive goes out as it is built. StreamingResponse runs
+    # this generator in the threadpool, off the event loop.
+    stream = ArchiveStream()
+
+    # Converted images are already compressed, so entries are stored as-is.
+    with zipfile.ZipFile(stream, "w", compression=zipfile.ZIP_STORED) as archive:
+        for job in jobs:
+            obj = storage_client.get_object(
+                Bucket=settings.storage_converted_bucket,
+                Key=job.output_path,
+            )
+            name = f"{job.id}_{job.filename.rsplit('.', 1)[0]}.{job.target_format}"
+
+            with archive.open(name, "w") as entry:
+                for chunk in obj["Body"].iter_chunks(chunk_size=1024 * 1024):
+                    entry.write(chunk)
+
+                    if data := stream.drain():
+                        yield data
+
+    if data := stream.drain():
+        yield data
+
+
+@router.get("/batch/{batch_id}/download")
+async def download_batch(
+    batch_id: str,
+    db: AsyncSession = Depends(get_db),
+    user=Depends(get_current_user),
+) -> StreamingResponse:
+    if not user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication required")
+
+    jobs = [
+        job for job in await get_batch_jobs(db, batch_id, user.id)
+        if job.status == JobStatus.SUCCESS and job.output_path
+    ]
+
+    if not jobs:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No converted files in batch yet")
+
+    return StreamingResponse(
+        stream_batch_archive(jobs),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{batch_id}.zip"'},
+    )
 
 
 @router.get(
@@ -166,10 +855,128 @@ async def get_status(
 
     return job
 
-def stream_from_minio(bucket: str, key: str) -> Generator[bytes, None, None]:
-    obj = storage_client.get_object(Bucket=bucket, Key=key)
-    for chunk in obj["Body"].iter_chunks(chunk_size=8192):
-        yield chunk
+def format_http_date(value: datetime) -> str:
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def is_not_modified_since(request: Request, last_modified: datetime | None) -> bool:
+    header = request.headers.get("if-modified-since")
+
+    # If-None-Match takes precedence over If-Modified-Since (RFC 9110).
+    if not header or last_modified is None or "if-none-match" in request.headers:
+        return False
+
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+
+    return last_modified.replace(microsecond=0) <= since
+
+
+def get_single_range(request: Request) -> str | None:
+    header = request.headers.get("range")
+
+    # Multi-range requests are answered with the full body, which RFC 9110
+    # allows. Objects are never overwritten (keys are random), so If-Range
+    # always matches and needs no extra check.
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+
+    return header
+
+
+async def object_response(
+    request: Request,
+    key: str,
+    filename: str,
+    media_type: str,
+    disposition: str,
+    last_modified: datetime | None,
+    cache_control: str | None = None,
+) -> Response:
+    cache_headers = {}
+
+    if last_modified:
+        cache_headers["Last-Modified"] = format_http_date(last_modified)
+    if cache_control:
+        cache_headers["Cache-Control"] = cache_control
+
+    if is_not_modified_since(request, last_modified):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers)
+
+    params = {}
+
+    if if_none_match := request.headers.get("if-none-match"):
+        params["IfNoneMatch"] = if_none_match
+    if byte_range := get_single_range(request):
+        params["Range"] = byte_range
+
+    try:
+        obj = await get_object(settings.storage_converted_bucket, key, **params)
+    except ClientError as e:
+        metadata = e.response.get("ResponseMetadata", {})
+        status_code = metadata.get("HTTPStatusCode")
+
+        if status_code == status.HTTP_304_NOT_MODIFIED:
+            etag = metadata.get("HTTPHeaders", {}).get("etag", if_none_match)
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED,
+                headers={**cache_headers, "ETag": etag},
+            )
+
+        if status_code == status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE:
+            # S3 reports the object size with the error, other stores may
+            # not, so it is looked up when missing.
+            size = e.response.get("Error", {}).get("ActualObjectSize")
+
+            if size is None:
+                head = await head_object(settings.storage_converted_bucket, key)
+                size = head["ContentLength"]
+
+            raise HTTPException(
+                status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                detail="Requested range not satisfiable",
+                headers={**cache_headers, "Content-Range": f"bytes */{size}"},
+            )
+
+        raise HTTPException(status_code=500, detail=f"Storage error: {e}")
+
+    headers = {
+        **cache_headers,
+        "Content-Disposition": f'{disposition}; filename="{filename}"',
+        "Content-Length": str(obj["ContentLength"]),
+        "Accept-Ranges": "bytes",
+        "ETag": obj["ETag"],
+    }
+    status_code = status.HTTP_200_OK
+
+    if content_range := obj.get("ContentRange"):
+        headers["Content-Range"] = content_range
+        status_code = status.HTTP_206_PARTIAL_CONTENT
+
+    return StreamingResponse(
+        iter_object_body(obj["Body"], chunk_size=get_stream_chunk_size(obj["ContentLength"])),
+        status_code=status_code,
+        media_type=media_type,
+        headers=headers,
+    )
+
+
+def get_preview_key(output_path: str, size: int) -> str:
+    return f"previews/{output_path.rsplit('.', 1)[0]}/{size}.webp"
+
+
+def pick_preview_size(job: Job, size: int | None) -> int | None:
+    if not size or not job.preview_sizes:
+        return None
+
+    sizes = sorted(int(preview_size) for preview_size in job.preview_sizes.split(","))
+
+    return next((preview_size for preview_size in sizes if preview_size >= size), None)
 
 
 async def get_job_or_404(db: AsyncSession, job_id: int, user_id: int) -> Job:
@@ -185,49 +992,81 @@ async def get_job_or_404(db: AsyncSession, job_id: int, user_id: int) -> Job:
 @router.get("/download/{job_id}")
 async def download_job(
     job_id: int,
+    request: Request,
     db: AsyncSession = Depends(get_db),
     user=Depends(get_current_user),
-) -> StreamingResponse:
+) -> Response:
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication required")
 
     job = await get_job_or_404(db, job_id, user.id)
 
-    try:
-        file_stream = stream_from_minio(settings.storage_converted_bucket, job.output_path)
-    except ClientError as e:
-        raise HTTPException(status_code=500, detail=f"Storage error: {e}")
-
     filename = f"{job.filename.split('.')[0]}.{job.target_format}"
     media_type = f"image/{job.target_format}"
 
-    return StreamingResponse(
-        file_stream,
+    if settings.storage_presigned_downloads:
+        return RedirectResponse(
+            generate_presigned_download_url(
+                settings.storage_converted_bucket,
+                job.output_path,
+                filename=filename,
+                media_type=media_type,
+                disposition="attachment",
+            ),
+            status_code=status.HTTP_302_FOUND,
+        )
+
+    return await object_response(
+        request,
+        key=job.output_path,
+        filename=filename,
         media_type=media_type,
-        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        disposition="attachment",
+        last_modified=job.finished_at,
     )
 
 @router.get("/preview/{job_id}")
 async def preview_job(
     job_id: int,
+    request: Request,
+    size: int | None = Query(None, ge=1),
     db: AsyncSession = Depends(get_db),
     user=Depends(get_current_user),
-) -> StreamingResponse:
+) -> Response:
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication required")
 
     job = await get_job_or_404(db, job_id, user.id)
 
-    try:
-        file_stream = stream_from_minio(settings.storage_converted_bucket, job.output_path)
-    except ClientError as e:
-        raise HTTPException(status_code=500, detail=f"Storage error: {e}")
+    stem = job.filename.split('.')[0]
 
-    filename = f"{job.filename.split('.')[0]}.{job.target_format}"
-    media_type = f"image/{job.target_format}"
+    if preview_size := pick_preview_size(job, size):
+        key = get_preview_key(job.output_path, preview_size)
+        filename = f"{stem}_{preview_size}.webp"
+        media_type = "image/webp"
+    else:
+        key = job.output_path
+        filename = f"{stem}.{job.target_format}"
+        media_type = f"image/{job.target_format}"
 
-    return StreamingResponse(
-        file_stream,
+    if settings.storage_presigned_downloads:
+        return RedirectResponse(
+            generate_presigned_download_url(
+                settings.storage_converted_bucket,
+                key,
+                filename=filename,
+                media_type=media_type,
+                disposition="inline",
+            ),
+            status_code=status.HTTP_302_FOUND,
+        )
+
+    return await object_response(
+        request,
+        key=key,
+        filename=filename,
         media_type=media_type,
-        headers={"Content-Disposition": f'inline; filename="{filename}"'},
-    )
\ No newline at end of file
+        disposition="inline",
+        last_modified=job.finished_at,
+        cache_control=settings.preview_cache_control,
+    )
@@ -1,12 +1,98 @@
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+import json
+from typing import Set
+from datetime import datetime, timezone
+from sqlalchemy import func, or_, select
+from fastapi import APIRouter, HTTPException, Query, WebSocket, WebSocketDisconnect, status
+
+from core.db import AsyncSessionLocal
+from core.settings import get_settings
+from models.job import Job, JobStatus
+from utils.dependencies import resolve_user
+from utils.status import job_status_from_job, read_cached_statuses
 
 from routes.ws.utils import (
     connect_job,
     disconnect_job,
+    connect_user,
+    disconnect_user,
 )
 
+settings = get_settings()
+
 router = APIRouter(tags=["ws"])
 
+
+async def load_snapshot(
+    user_id: int,
+    job_ids: Set[int] | None = None,
+    since: datetime | None = None,
+) -> list:
+    query = select(Job).where(Job.user_id == user_id)
+
+    if job_ids:
+        query = query.where(Job.id.in_(job_ids))
+    else:
+        in_flight = Job.status.in_([JobStatus.PENDING, JobStatus.PROCESSING])
+
+        if since:
+            updated_at = func.coalesce(Job.finished_at, Job.started_at, Job.created_at)
+            query = query.where(or_(in_flight, updated_at > since))
+        else:
+            query = query.where(in_flight)
+
+    query = query.order_by(Job.id.desc()).limit(settings.job_status_batch_max)
+
+    async with AsyncSessionLocal() as db:
+        statuses = {job.id: job_status_from_job(job) for job in (await db.execute(query)).scalars()}
+
+    # Redis holds what the worker published last, which may be newer than the row.
+    statuses.update(await read_cached_statuses(list(statuses), user_id))
+
+    return [job_status.model_dump(mode="json") for job_status in statuses.values()]
+
+
+@router.websocket("/jobs")
+async def user_job_updates(
+    websocket: WebSocket,
+    token: str = Query(...),
+    since: datetime | None = Query(None),
+):
+    try:
+        async with AsyncSessionLocal() as db:
+            user = await resolve_user(db, token)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    if since and since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+
+    await websocket.accept()
+    connection = await connect_user(websocket, user.id)
+
+    try:
+        connection.push_snapshot(await load_snapshot(user.id, since=since))
+
+        while True:
+            try:
+                data = json.loads(await websocket.receive_text())
+                action = data.get("action")
+                job_ids = {int(job_id) for job_id in data.get("job_ids", [])}
+                only = bool(data.get("only", False))
+            except (ValueError, TypeError, AttributeError):
+                continue
+
+            if action == "subscribe" and job_ids:
+                connection.subscribe(job_ids, only=only)
+                connection.push_snapshot(await load_snapshot(user.id, job_ids=job_ids))
+            elif action == "unsubscribe" and job_ids:
+                connection.unsubscribe(job_ids)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        await disconnect_user(websocket, user.id)
+
+
 @router.websocket("/jobs/{job_id}")
 async def job_updates(websocket: WebSocket, job_id: int):
     await connect_job(websocket, job_id)
@@ -14,4 +100,6 @@ async def job_updates(websocket: WebSocket, job_id: int):
         while True:
             await websocket.receive_text()
     except WebSocketDisconnect:
-        await disconnect_job(websocket, job_id)
\ No newline at end of file
+        pass
+    finally:
+        await disconnect_job(websocket, job_id)
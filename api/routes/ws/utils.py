@@ -1,53 +1,247 @@
-import os
 import json
-import redis.asyncio as redis
+import asyncio
 from fastapi import WebSocket
-from typing import Dict, List
+from typing import Dict, Set
+from redis.asyncio.client import PubSub
+from prometheus_client import Counter
+from core.redis import get_redis
 from core.settings import get_settings
 
 settings = get_settings()
 
-active_connections: Dict[int, List[WebSocket]] = {}
-redis_client: redis.Redis | None = None
+JOB_CHANNEL_PREFIX = "jobs_channel:"
+USER_CHANNEL_PREFIX = "user_jobs_channel:"
 
+ws_dropped_messages = Counter(
+    "pixelforge_ws_dropped_messages_total",
+    "WebSocket messages dropped because a client's send queue was full",
+)
 
-async def get_redis():
-    global redis_client
-    if redis_client is None:
-        redis_url = settings.redis_url
-        redis_client = redis.from_url(redis_url, decode_responses=True)
-    return redis_client
+
+class Connection:
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self.queue: asyncio.Queue[str] = asyncio.Queue(maxsize=settings.ws_send_queue_size)
+        self.sender = asyncio.create_task(self.send_loop())
+
+    def push(self, text: str):
+        # Status updates supersede each other, so a slow client loses its
+        # oldest pending message instead of holding up the broadcaster.
+        if self.queue.full():
+            self.queue.get_nowait()
+            ws_dropped_messages.inc()
+
+        self.queue.put_nowait(text)
+
+    async def send_loop(self):
+        try:
+            while True:
+                text = await self.queue.get()
+                await asyncio.wait_for(
+                    self.websocket.send_text(text),
+                    timeout=settings.ws_send_timeout_seconds,
+                )
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # The route's receive loop sees the close and unregisters us.
+            try:
+                await self.websocket.close()
+            except Exception:
+                pass
+
+    def close(self):
+        self.sender.cancel()
+
+
+class UserConnection:
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self.job_ids: Set[int] | None = None
+        self.excluded_job_ids: Set[int] = set()
+        self.snapshot: list | None = None
+        self.pending: Dict[int, dict] = {}
+        self.wakeup = asyncio.Event()
+        self.sender = asyncio.create_task(self.send_loop())
+
+    def subscribe(self, job_ids: Set[int], only: bool = False):
+        # The stream carries all of the user's jobs until a client asks for
+        # only some; a plain subscribe just takes back an unsubscribe.
+        if only or self.job_ids is not None:
+            self.job_ids = (self.job_ids or set()) | job_ids
+
+        self.excluded_job_ids -= job_ids
+
+    def unsubscribe(self, job_ids: Set[int]):
+        if self.job_ids is None:
+            self.excluded_job_ids |= job_ids
+        else:
+            self.job_ids -= job_ids
+
+    def push_snapshot(self, jobs: list):
+        self.snapshot = jobs
+        self.wakeup.set()
+
+    def push(self, update: dict):
+        job_id = update["job_id"]
+
+        if self.job_ids is not None and job_id not in self.job_ids:
+            return
+
+        if job_id in self.excluded_job_ids:
+            return
+
+        # Only the latest update per job is kept until the next flush, which
+        # bounds the queue by the number of jobs instead of the update rate.
+        self.pending[job_id] = update
+        self.wakeup.set()
+
+    async def send_loop(self):
+        try:
+            while True:
+                await self.wakeup.wait()
+                await asyncio.sleep(settings.ws_coalesce_interval_seconds)
+                self.wakeup.clear()
+
+                if self.snapshot is not None:
+                    snapshot, self.snapshot = self.snapshot, None
+                    await asyncio.wait_for(
+                        self.websocket.send_json({"type": "snapshot", "jobs": snapshot}),
+                        timeout=settings.ws_send_timeout_seconds,
+                    )
+
+                if not self.pending:
+                    continue
+
+                updates = list(self.pending.values())
+                self.pending = {}
+
+                await asyncio.wait_for(
+                    self.websocket.send_json({"type": "updates", "updates": updates}),
+                    timeout=settings.ws_send_timeout_seconds,
+                )
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            try:
+                await self.websocket.close()
+            except Exception:
+                pass
+
+    def close(self):
+        self.sender.cancel()
+
+
+active_connections: Dict[int, Dict[WebSocket, Connection]] = {}
+user_connections: Dict[int, Dict[WebSocket, UserConnection]] = {}
+pubsub: PubSub | None = None
+has_subscriptions = asyncio.Event()
+
+
+def job_channel(job_id: int) -> str:
+    return f"{JOB_CHANNEL_PREFIX}{job_id}"
+
+
+def user_channel(user_id: int) -> str:
+    return f"{USER_CHANNEL_PREFIX}{user_id}"
+
+
+async def get_pubsub() -> PubSub:
+    global pubsub
+    if pubsub is None:
+        r = await get_redis()
+        pubsub = r.pubsub()
+    return pubsub
 
 
 async def connect_job(websocket: WebSocket, job_id: int):
     await websocket.accept()
-    active_connections.setdefault(job_id, []).append(websocket)
+    connections = active_connections.setdefault(job_id, {})
+    first_connection = not connections
+    connections[websocket] = Connection(websocket)
+
+    # A process only listens to the channels of jobs it has sockets for.
+    if first_connection:
+        await (await get_pubsub()).subscribe(job_channel(job_id))
+        has_subscriptions.set()
 
 
 async def disconnect_job(websocket: WebSocket, job_id: int):
-    active_connections[job_id].remove(websocket)
-    if not active_connections[job_id]:
+    connections = active_connections.get(job_id)
+
+    if connections is None:
+        return
+
+    if connection := connections.pop(websocket, None):
+        connection.close()
+
+    if not connections:
         del active_connections[job_id]
+        await (await get_pubsub()).unsubscribe(job_channel(job_id))
+
+        if not active_connections and not user_connections:
+            has_subscriptions.clear()
+
+
+async def connect_user(websocket: WebSocket, user_id: int) -> UserConnection:
+    connections = user_connections.setdefault(user_id, {})
+    first_connection = not connections
+    connection = connections[websocket] = UserConnection(websocket)
+
+    if first_connection:
+        await (await get_pubsub()).subscribe(user_channel(user_id))
+        has_subscriptions.set()
+
+    return connection
+
+
+async def disconnect_user(websocket: WebSocket, user_id: int):
+    connections = user_connections.get(user_id)
+
+    if connections is None:
+        return
+
+    if connection := connections.pop(websocket, None):
+        connection.close()
+
+    if not connections:
+        del user_connections[user_id]
+        await (await get_pubsub()).unsubscribe(user_channel(user_id))
+
+        if not active_connections and not user_connections:
+            has_subscriptions.clear()
 
 
 async def notify_job(job_id: int, message: dict):
     r = await get_redis()
-    await r.publish("jobs_channel", json.dumps({"job_id": job_id, "message": message}))
+    await r.publish(job_channel(job_id), json.dumps(message))
 
 
 async def broadcast_listener():
-    r = await get_redis()
-    pubsub = r.pubsub()
-    await pubsub.subscribe("jobs_channel")
-
-    async for msg in pubsub.listen():
-        if msg["type"] == "message":
-            data = json.loads(msg["data"])
-            job_id = data["job_id"]
-            message = data["message"]
-            for ws in active_connections.get(job_id, []):
-                try:
-                    await ws.send_json(message)
-                except Exception:
-                    await disconnect_job(ws, job_id)
+    ps = await get_pubsub()
+
+    while True:
+        if not ps.subscribed:
+            await has_subscriptions.wait()
+            continue
+
+        msg = await ps.get_message(ignore_subscribe_messages=True, timeout=1.0)
+
+        if msg is None or msg["type"] != "message":
+            continue
+
+        if msg["channel"].startswith(USER_CHANNEL_PREFIX):
+            user_id = int(msg["channel"].removeprefix(USER_CHANNEL_PREFIX))
+            update = json.loads(msg["data"])
+
+            for connection in list(user_connections.get(user_id, {}).values()):
+                connection.push(update)
+
+            continue
+
+        job_id = int(msg["channel"].removeprefix(JOB_CHANNEL_PREFIX))
 
+        # The payload is forwarded as-is: no decoding, and each connection
+        # sends from its own queue so one slow client delays nobody else.
+        for connection in list(active_connections.get(job_id, {}).values()):
+            connection.push(msg["data"])
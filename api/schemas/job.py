@@ -1,10 +1,11 @@
 from enum import Enum
-from fastapi import Form, File
+from fastapi import Depends, Form, File
 from typing import Type
+from typing import List
 from typing import Optional
 from datetime import datetime
 from fastapi import UploadFile
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, computed_field
 
 
 class JobImageExtension(str, Enum):
@@ -34,17 +35,91 @@ class JobStatus(str, Enum):
     FAILED = "FAILED"
 
 
+class JobOptions(BaseModel):
+    quality: Optional[int] = Field(None, ge=1, le=100)
+    max_width: Optional[int] = Field(None, ge=1)
+    max_height: Optional[int] = Field(None, ge=1)
+    lossless: Optional[bool] = None
+    progressive: Optional[bool] = None
+    optimize: Optional[bool] = None
+    strip_metadata: Optional[bool] = None
+    compress_level: Optional[int] = Field(None, ge=0, le=9)
+
+    @classmethod
+    def as_form(
+        cls: Type["JobOptions"],
+        quality: Optional[int] = Form(None, ge=1, le=100),
+        max_width: Optional[int] = Form(None, ge=1),
+        max_height: Optional[int] = Form(None, ge=1),
+        lossless: Optional[bool] = Form(None),
+        progressive: Optional[bool] = Form(None),
+        optimize: Optional[bool] = Form(None),
+        strip_metadata: Optional[bool] = Form(None),
+        compress_level: Optional[int] = Form(None, ge=0, le=9),
+    ) -> "JobOptions":
+        return cls(
+            quality=quality,
+            max_width=max_width,
+            max_height=max_height,
+            lossless=lossless,
+            progressive=progressive,
+            optimize=optimize,
+            strip_metadata=strip_metadata,
+            compress_level=compress_level,
+        )
+
+    def to_dict(self) -> dict | None:
+        # Unset options are left out so jobs without any share cache entries
+        # with jobs created before options existed.
+        return self.model_dump(exclude_none=True) or None
+
+
 class JobCreate(BaseModel):
     file: UploadFile
     target_format: JobImageExtension = Form(...)
+    options: JobOptions = JobOptions()
 
     @classmethod
     def as_form(
         cls: Type["JobCreate"],
         file: UploadFile = File(...),
         target_format: JobImageExtension = Form(...),
+        options: JobOptions = Depends(JobOptions.as_form),
     ) -> "JobCreate":
-        return cls(file=file, target_format=target_format)
+        return cls(file=file, target_format=target_format, options=options)
+
+
+class JobBatchCreate(BaseModel):
+    files: List[UploadFile]
+    target_format: JobImageExtension = Form(...)
+    options: JobOptions = JobOptions()
+
+    @classmethod
+    def as_form(
+        cls: Type["JobBatchCreate"],
+        files: List[UploadFile] = File(...),
+        target_format: JobImageExtension = Form(...),
+        options: JobOptions = Depends(JobOptions.as_form),
+    ) -> "JobBatchCreate":
+        return cls(files=files, target_format=target_format, options=options)
+
+
+class JobUploadUrlCreate(BaseModel):
+    filename: str
+    content_type: Optional[str] = None
+
+
+class JobUploadUrlRead(BaseModel):
+    upload_url: str
+    input_path: str
+    expires_in: int
+
+
+class JobFinalize(BaseModel):
+    input_path: str
+    filename: str
+    target_format: JobImageExtension
+    options: JobOptions = JobOptions()
 
 
 class JobRead(BaseModel):
@@ -56,10 +131,65 @@ class JobRead(BaseModel):
     target_format: JobImageExtension
     input_size_bytes: Optional[int]
     output_size_bytes: Optional[int]
+    width: Optional[int] = None
+    height: Optional[int] = None
+    mode: Optional[str] = None
+    preview_sizes: Optional[str] = None
+    options: Optional[dict] = None
     user_id: int
     status: JobStatus
     created_at: datetime
+    batch_id: Optional[str] = None
+
+    @computed_field
+    @property
+    def savings_bytes(self) -> Optional[int]:
+        if self.input_size_bytes is None or self.output_size_bytes is None:
+            return None
+        return self.input_size_bytes - self.output_size_bytes
+
+    @computed_field
+    @property
+    def savings_ratio(self) -> Optional[float]:
+        if not self.input_size_bytes or self.output_size_bytes is None:
+            return None
+        return round(1 - self.output_size_bytes / self.input_size_bytes, 4)
 
     class Config:
         from_attributes = True
 
+
+class JobStatusQuery(BaseModel):
+    ids: Optional[List[int]] = None
+    since: Optional[datetime] = None
+
+
+class JobStatusRead(BaseModel):
+    id: int
+    status: JobStatus
+    output_path: Optional[str] = None
+    output_size_bytes: Optional[int] = None
+    updated_at: datetime
+
+
+class JobQueueRead(BaseModel):
+    active: int
+    parked: int
+    max_active: int
+    max_queued: int
+
+
+class JobBatchRead(BaseModel):
+    batch_id: str
+    total: int
+    pending: int
+    processing: int
+    success: int
+    failed: int
+    jobs: List[JobRead]
+
+    @computed_field
+    @property
+    def savings_bytes(self) -> int:
+        return sum(job.savings_bytes or 0 for job in self.jobs)
+
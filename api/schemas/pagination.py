@@ -1,3 +1,4 @@
+from enum import Enum
 from fastapi import Query
 from pydantic import BaseModel
 from typing import List, TypeVar, Generic
@@ -5,16 +6,26 @@ from typing import List, TypeVar, Generic
 T = TypeVar("T")
 
 
+class CountMode(str, Enum):
+    EXACT = "exact"
+    ESTIMATE = "estimate"
+    NONE = "none"
+
+
 class PaginationParams(BaseModel):
     page: int = Query(1, ge=1)
     size: int = Query(10, ge=1, le=100)
+    cursor: int | None = Query(None, ge=1)
+    count: CountMode = Query(CountMode.EXACT)
 
 
 class PaginatedResponse(BaseModel, Generic[T]):
-    count: int
-    page: int
+    count: int | None
+    # None for keyset pages, which have no position to report.
+    page: int | None
     size: int
-    pages: int
+    pages: int | None
     next_url: str | None
     prev_url: str | None
-    results: List[T]
\ No newline at end of file
+    next_cursor: int | None = None
+    results: List[T]
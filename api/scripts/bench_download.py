@@ -0,0 +1,91 @@
+"""Compare the legacy and adaptive download streaming paths.
+
+Uploads a random object to the upload bucket, then streams it back through
+both implementations the way Starlette would consume them, reporting MB/s
+and process CPU seconds per download. Run from the api directory against a
+reachable MinIO:
+
+    python -m scripts.bench_download --size-mb 50 --runs 5
+"""
+import os
+import time
+import uuid
+import asyncio
+import argparse
+
+from io import BytesIO
+from statistics import median
+from starlette.concurrency import iterate_in_threadpool
+
+from core.settings import get_settings
+from core.storage import (
+    storage_client,
+    get_object,
+    iter_object_body,
+    get_stream_chunk_size,
+)
+
+settings = get_settings()
+
+
+def legacy_stream(bucket: str, key: str):
+    obj = storage_client.get_object(Bucket=bucket, Key=key)
+    for chunk in obj["Body"].iter_chunks(chunk_size=8192):
+        yield chunk
+
+
+async def consume_legacy(bucket: str, key: str) -> int:
+    total = 0
+    async for chunk in iterate_in_threadpool(legacy_stream(bucket, key)):
+        total += len(chunk)
+    return total
+
+
+async def consume_adaptive(bucket: str, key: str) -> int:
+    obj = await get_object(bucket, key)
+    total = 0
+    async for chunk in iter_object_body(obj["Body"], get_stream_chunk_size(obj["ContentLength"])):
+        total += len(chunk)
+    return total
+
+
+async def measure(name: str, consume, bucket: str, key: str, runs: int):
+    throughputs = []
+    cpu_times = []
+
+    for _ in range(runs):
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+
+        size = await consume(bucket, key)
+
+        cpu_times.append(time.process_time() - cpu_start)
+        throughputs.append(size / (1024 * 1024) / (time.perf_counter() - wall_start))
+
+    print(
+        f"{name:<10} median {median(throughputs):8.1f} MB/s   "
+        f"median CPU {median(cpu_times) * 1000:8.1f} ms/download"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size-mb", type=int, default=50)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    bucket = settings.storage_upload_bucket
+    key = f"bench/{uuid.uuid4().hex}.bin"
+
+    storage_client.put_object(Bucket=bucket, Key=key, Body=BytesIO(os.urandom(args.size_mb * 1024 * 1024)))
+
+    try:
+        print(f"object: {args.size_mb} MB, adaptive chunk: {get_stream_chunk_size(args.size_mb * 1024 * 1024)} bytes")
+        await measure("legacy", consume_legacy, bucket, key, args.runs)
+        await measure("adaptive", consume_adaptive, bucket, key, args.runs)
+    finally:
+        storage_client.delete_object(Bucket=bucket, Key=key)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
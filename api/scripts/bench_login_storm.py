@@ -0,0 +1,98 @@
+"""Measure latency of other endpoints while the API is flooded with logins.
+
+Registers (or reuses) a benchmark user, starts --logins concurrent sign-in
+loops and meanwhile probes GET /format/image, printing probe p50/p99 and the
+login throughput. Run it against a live API, before and after a change:
+
+    python -m scripts.bench_login_storm --base-url http://localhost:8000/api/v1 --logins 50
+"""
+import json
+import time
+import argparse
+import threading
+import urllib.error
+import urllib.request
+
+from statistics import quantiles
+from concurrent.futures import ThreadPoolExecutor
+
+BENCH_EMAIL = "bench-login-storm@pixelforge.local"
+BENCH_PASSWORD = "bench-login-storm"
+
+
+def post_json(url: str, payload: dict) -> tuple[int, dict]:
+    request = urllib.request.Request(
+        url,
+        data=json.dumps(payload).encode(),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, {}
+
+
+def get(url: str, token: str) -> int:
+    request = urllib.request.Request(url, headers={"Authorization": f"Bearer {token}"})
+
+    try:
+        with urllib.request.urlopen(request) as response:
+            response.read()
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def login_loop(base_url: str, stop: threading.Event, counters: dict, lock: threading.Lock):
+    while not stop.is_set():
+        code, _ = post_json(f"{base_url}/auth/signin", {"email": BENCH_EMAIL, "password": BENCH_PASSWORD})
+
+        with lock:
+            counters[code] = counters.get(code, 0) + 1
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://localhost:8000/api/v1")
+    parser.add_argument("--logins", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=20.0)
+    args = parser.parse_args()
+
+    post_json(f"{args.base_url}/auth/register", {
+        "username": "bench-login-storm",
+        "email": BENCH_EMAIL,
+        "password": BENCH_PASSWORD,
+    })
+    _, token = post_json(f"{args.base_url}/auth/signin", {"email": BENCH_EMAIL, "password": BENCH_PASSWORD})
+    token = token["access_token"]
+
+    stop = threading.Event()
+    counters: dict = {}
+    lock = threading.Lock()
+    latencies = []
+
+    with ThreadPoolExecutor(max_workers=args.logins) as pool:
+        for _ in range(args.logins):
+            pool.submit(login_loop, args.base_url, stop, counters, lock)
+
+        deadline = time.perf_counter() + args.duration
+
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            get(f"{args.base_url}/format/image", token)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+        stop.set()
+
+    percentiles = quantiles(latencies, n=100)
+
+    print(f"probe requests: {len(latencies)}")
+    print(f"probe p50: {percentiles[49]:.1f} ms   p99: {percentiles[98]:.1f} ms")
+    print(f"logins/s: {sum(counters.values()) / args.duration:.1f}   by status: {counters}")
+
+
+if __name__ == "__main__":
+    main()
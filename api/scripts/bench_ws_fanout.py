@@ -0,0 +1,84 @@
+"""Fan-out benchmark for the job WebSocket endpoint.
+
+Opens --sockets connections spread over --jobs job ids, publishes --messages
+updates per job straight to the per-job Redis channels and reports delivery
+latency percentiles. Raise the file descriptor limit first (ulimit -n) when
+going to 10k sockets:
+
+    python -m scripts.bench_ws_fanout --ws-url ws://localhost:8000/api/v1/ws/jobs --sockets 10000 --jobs 1000
+"""
+import json
+import time
+import asyncio
+import argparse
+import websockets
+
+from statistics import quantiles
+
+from core.redis import get_redis
+from routes.ws.utils import job_channel
+
+
+async def listen(url: str, expected: int, latencies: list, ready: asyncio.Event, connected: list):
+    async with websockets.connect(url, max_queue=None) as websocket:
+        connected.append(websocket)
+        await ready.wait()
+
+        for _ in range(expected):
+            message = json.loads(await websocket.recv())
+            latencies.append((time.time() - message["sent_at"]) * 1000)
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ws-url", default="ws://localhost:8000/api/v1/ws/jobs")
+    parser.add_argument("--sockets", type=int, default=10_000)
+    parser.add_argument("--jobs", type=int, default=1_000)
+    parser.add_argument("--messages", type=int, default=5)
+    parser.add_argument("--first-job-id", type=int, default=1_000_000_000)
+    args = parser.parse_args()
+
+    latencies: list = []
+    connected: list = []
+    ready = asyncio.Event()
+    job_ids = [args.first_job_id + index for index in range(args.jobs)]
+
+    listeners = [
+        asyncio.create_task(listen(
+            f"{args.ws_url}/{job_ids[index % args.jobs]}",
+            args.messages,
+            latencies,
+            ready,
+            connected,
+        ))
+        for index in range(args.sockets)
+    ]
+
+    while len(connected) < args.sockets:
+        await asyncio.sleep(0.1)
+
+    # Give the API a moment to finish its channel subscriptions.
+    await asyncio.sleep(1)
+    ready.set()
+
+    r = await get_redis()
+    started = time.perf_counter()
+
+    for sequence in range(args.messages):
+        for job_id in job_ids:
+            await r.publish(job_channel(job_id), json.dumps({
+                "status": "PROCESSING",
+                "sequence": sequence,
+                "sent_at": time.time(),
+            }))
+
+    await asyncio.gather(*listeners)
+    elapsed = time.perf_counter() - started
+    percentiles = quantiles(latencies, n=100)
+
+    print(f"sockets: {args.sockets}   jobs: {args.jobs}   delivered: {len(latencies)} in {elapsed:.2f} s")
+    print(f"latency p50: {percentiles[49]:.1f} ms   p99: {percentiles[98]:.1f} ms   max: {max(latencies):.1f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
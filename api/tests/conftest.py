@@ -0,0 +1,4 @@
+import os
+
+# Settings are read at import time and the secret has no default.
+os.environ.setdefault("SECRET_KEY", "test")
@@ -0,0 +1,66 @@
+import asyncio
+
+from routes.ws.utils import UserConnection
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_json(self, data: dict):
+        self.sent.append(data)
+
+    async def close(self):
+        pass
+
+
+def run(check):
+    async def main():
+        connection = UserConnection(FakeWebSocket())
+        try:
+            check(connection)
+        finally:
+            connection.close()
+
+    asyncio.run(main())
+
+
+def test_subscribe_keeps_updates_for_other_jobs():
+    def check(connection: UserConnection):
+        connection.subscribe({1})
+        connection.push({"job_id": 2, "status": "SUCCESS"})
+
+        assert 2 in connection.pending
+
+    run(check)
+
+
+def test_subscribe_after_unsubscribe_resumes_updates():
+    def check(connection: UserConnection):
+        connection.unsubscribe({1})
+        connection.push({"job_id": 1, "status": "PROCESSING"})
+        assert 1 not in connection.pending
+
+        connection.subscribe({1})
+        connection.push({"job_id": 1, "status": "SUCCESS"})
+        connection.push({"job_id": 2, "status": "SUCCESS"})
+
+        assert set(connection.pending) == {1, 2}
+
+    run(check)
+
+
+def test_subscribe_only_narrows_updates():
+    def check(connection: UserConnection):
+        connection.subscribe({1}, only=True)
+        connection.push({"job_id": 1, "status": "SUCCESS"})
+        connection.push({"job_id": 2, "status": "SUCCESS"})
+
+        assert set(connection.pending) == {1}
+
+        connection.subscribe({2})
+        connection.push({"job_id": 2, "status": "SUCCESS"})
+
+        assert set(connection.pending) == {1, 2}
+
+    run(check)
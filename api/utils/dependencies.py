@@ -5,6 +5,7 @@ from fastapi import Depends, HTTPException, status
 
 from core.db import get_db
 from core.settings import get_settings
+from core.user_cache import cache_user, get_cached_user
 
 from models.user import User
 from schemas.user import TokenData
@@ -17,6 +18,10 @@ async def get_current_user(
     db: Session = Depends(get_db),
     token: str = Depends(oauth2_scheme)
 ) -> User:
+    return await resolve_user(db, token)
+
+
+async def resolve_user(db: Session, token: str) -> User:
     try:
         payload = jwt.decode(
             token=token,
@@ -40,6 +45,9 @@ async def get_current_user(
             detail="Invalid token"
         )
 
+    if user := await get_cached_user(token_data.email):
+        return user
+
     result = await db.execute(select(User).where(User.email == token_data.email))
     user = result.scalars().one_or_none()
 
@@ -49,4 +57,6 @@ async def get_current_user(
             detail="User not found"
         )
 
+    await cache_user(user)
+
     return user
\ No newline at end of file
@@ -0,0 +1,59 @@
+from typing import IO, NamedTuple
+from fastapi import HTTPException, status
+from PIL import Image, UnidentifiedImageError
+
+from core.settings import get_settings
+
+settings = get_settings()
+
+# Pillow warns past this many pixels and refuses twice as many on open, so
+# it is aligned with the limit enforced below.
+Image.MAX_IMAGE_PIXELS = settings.upload_max_pixels
+
+SUPPORTED_FORMATS = ("PNG", "JPEG", "BMP", "GIF", "TIFF", "WEBP")
+
+
+class ImageHeader(NamedTuple):
+    format: str
+    width: int
+    height: int
+    mode: str
+
+
+def read_image_header(file: IO[bytes], verify: bool = True) -> ImageHeader:
+    # Image.open only parses the header, and verify() walks the structure
+    # (chunk CRCs for PNG) without decoding any pixels.
+    file.seek(0)
+
+    try:
+        with Image.open(file) as img:
+            header = ImageHeader(img.format, img.width, img.height, img.mode)
+
+            if verify:
+                img.verify()
+    except Image.DecompressionBombError:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Image exceeds the limit of {settings.upload_max_pixels} pixels"
+        )
+    except (UnidentifiedImageError, OSError, SyntaxError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="File is not a valid image"
+        )
+    finally:
+        file.seek(0)
+
+    if header.format not in SUPPORTED_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Unsupported image format: {header.format}"
+        )
+
+    if header.width * header.height > settings.upload_max_pixels:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Image exceeds the limit of {settings.upload_max_pixels} pixels"
+        )
+
+    return header
@@ -1,13 +1,44 @@
+import json
+
 from math import ceil
 from fastapi import Request
 from typing import TypeVar, Type
-from sqlalchemy import select, func
+from sqlalchemy import select, func, text
 from sqlalchemy.ext.asyncio import AsyncSession
-from schemas.pagination import PaginatedResponse
+from schemas.pagination import CountMode, PaginatedResponse
 
 T = TypeVar("T")
 
 
+async def estimate_count(db: AsyncSession, query) -> int:
+    # The planner's row estimate avoids scanning every matching row, which
+    # is what makes exact counts slow for users with many jobs.
+    compiled = query.compile(dialect=db.bind.dialect, compile_kwargs={"literal_binds": True})
+    plan = await db.scalar(text(f"EXPLAIN (FORMAT JSON) {compiled}"))
+
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def count_rows(
+    db: AsyncSession,
+    model: Type[T],
+    base_query,
+    count_mode: CountMode,
+) -> int | None:
+    if count_mode == CountMode.NONE:
+        return None
+
+    if count_mode == CountMode.ESTIMATE:
+        return await estimate_count(db, select(model).where(*base_query._where_criteria))
+
+    return await db.scalar(
+        select(func.count()).select_from(model).where(*base_query._where_criteria)
+    )
+
+
 async def paginate(
     db: AsyncSession,
     model: Type[T],
@@ -15,27 +46,34 @@ async def paginate(
     page: int = 1,
     size: int = 10,
     request: Request | None = None,
+    count_mode: CountMode = CountMode.EXACT,
+    with_cursor: bool = False,
 ):
     if base_query is None:
         base_query = select(model)
 
-    total = await db.scalar(
-        select(func.count()).select_from(model).where(*base_query._where_criteria)
-    )
+    total = await count_rows(db, model, base_query, count_mode)
 
+    # One extra row tells whether a next page exists when no count is known.
     result = await db.execute(
-        base_query.offset((page - 1) * size).limit(size)
+        base_query.offset((page - 1) * size).limit(size + 1)
     )
 
-    pages = ceil(total / size) if total else 1
-
     items = result.scalars().all()
+    has_next = len(items) > size
+    items = items[:size]
+
+    pages = (ceil(total / size) if total else 1) if total is not None else None
+
+    # Lets a client switch to keyset paging from any offset page, including
+    # the first, when the query is ordered by id descending.
+    next_cursor = items[-1].id if with_cursor and has_next else None
 
     next_url = None
     prev_url = None
 
     if request:
-        if page < pages:
+        if has_next:
             next_url = str(request.url.include_query_params(page=page + 1, size=size))
         if page > 1:
             prev_url = str(request.url.include_query_params(page=page - 1, size=size))
@@ -48,5 +86,48 @@ async def paginate(
         results=items,
         next_url=next_url,
         prev_url=prev_url,
+        next_cursor=next_cursor,
     )
 
+
+async def paginate_cursor(
+    db: AsyncSession,
+    model: Type[T],
+    base_query=None,
+    cursor: int | None = None,
+    size: int = 10,
+    request: Request | None = None,
+    count_mode: CountMode = CountMode.EXACT,
+):
+    if base_query is None:
+        base_query = select(model).order_by(model.id.desc())
+
+    total = await count_rows(db, model, base_query, count_mode)
+
+    query = base_query
+
+    if cursor is not None:
+        query = query.where(model.id < cursor)
+
+    result = await db.execute(query.limit(size + 1))
+
+    items = result.scalars().all()
+    has_next = len(items) > size
+    items = items[:size]
+
+    next_cursor = items[-1].id if has_next else None
+    next_url = None
+
+    if request and next_cursor is not None:
+        next_url = str(request.url.include_query_params(cursor=next_cursor, size=size))
+
+    return PaginatedResponse(
+        count=total,
+        page=None,
+        size=size,
+        pages=(ceil(total / size) if total else 1) if total is not None else None,
+        results=items,
+        next_url=next_url,
+        prev_url=None,
+        next_cursor=next_cursor,
+    )
@@ -0,0 +1,42 @@
+import json
+from typing import List
+from datetime import datetime
+from models.job import Job
+from core.redis import get_redis
+from schemas.job import JobStatusRead
+
+JOB_STATUS_PREFIX = "job_status:"
+
+
+def job_updated_at(job: Job) -> datetime:
+    return job.finished_at or job.started_at or job.created_at
+
+
+def job_status_from_job(job: Job) -> JobStatusRead:
+    return JobStatusRead(
+        id=job.id,
+        status=job.status,
+        output_path=job.output_path,
+        output_size_bytes=job.output_size_bytes,
+        updated_at=job_updated_at(job),
+    )
+
+
+async def read_cached_statuses(job_ids: List[int], user_id: int) -> dict[int, JobStatusRead]:
+    if not job_ids:
+        return {}
+
+    r = await get_redis()
+    values = await r.mget([f"{JOB_STATUS_PREFIX}{job_id}" for job_id in job_ids])
+    statuses = {}
+
+    for raw in values:
+        if raw is None:
+            continue
+
+        data = json.loads(raw)
+
+        if data["user_id"] == user_id:
+            statuses[data["id"]] = JobStatusRead(**data)
+
+    return statuses
@@ -0,0 +1,127 @@
+import json
+import time
+import hashlib
+
+from typing import IO
+from sqlalchemy import delete, update
+from sqlalchemy.sql import func
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert
+
+from models import ConversionCache
+from core.redis import get_redis
+from core.settings import get_settings
+
+settings = get_settings()
+
+CACHE_KEY_PREFIX = "conversion_cache:"
+CACHE_LRU_KEY = "conversion_cache:lru"
+CACHE_BYTES_KEY = "conversion_cache:bytes"
+
+
+def conversion_cache_key(input_sha256: str, target_format: str, options: dict | None = None) -> str:
+    encoded_options = json.dumps(options or {}, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(f"{input_sha256}:{target_format}:{encoded_options}".encode()).hexdigest()
+
+
+def hash_file(file: IO[bytes]) -> str:
+    file.seek(0)
+    digest = hashlib.file_digest(file, "sha256").hexdigest()
+    file.seek(0)
+    return digest
+
+
+def lookup_conversion(session: Session, key: str) -> dict | None:
+    entry = get_redis().hgetall(f"{CACHE_KEY_PREFIX}{key}")
+
+    if not entry:
+        row = session.get(ConversionCache, key)
+
+        if row is None:
+            return None
+
+        entry = {
+            "input_path": row.input_path,
+            "output_path": row.output_path,
+            "output_size_bytes": str(row.output_size_bytes or 0),
+            "preview_sizes": row.preview_sizes or "",
+        }
+
+        if get_redis().hset(f"{CACHE_KEY_PREFIX}{key}", mapping=entry):
+            get_redis().incrby(CACHE_BYTES_KEY, row.output_size_bytes or 0)
+
+    get_redis().zadd(CACHE_LRU_KEY, {key: time.time()})
+
+    session.execute(
+        update(ConversionCache)
+        .where(ConversionCache.key == key)
+        .values(hits=ConversionCache.hits + 1, last_used_at=func.now())
+    )
+
+    return entry
+
+
+def store_conversion(
+    session: Session,
+    key: str,
+    input_sha256: str,
+    target_format: str,
+    options: dict | None,
+    input_path: str,
+    output_path: str,
+    output_size_bytes: int,
+    preview_sizes: str | None = None,
+):
+    session.execute(
+        insert(ConversionCache)
+        .values(
+            key=key,
+            input_sha256=input_sha256,
+            target_format=target_format,
+            options=json.dumps(options or {}, sort_keys=True),
+            input_path=input_path,
+            output_path=output_path,
+            output_size_bytes=output_size_bytes,
+            preview_sizes=preview_sizes,
+            hits=0,
+        )
+        .on_conflict_do_nothing(index_elements=[ConversionCache.key])
+    )
+
+    entry = {
+        "input_path": input_path,
+        "output_path": output_path,
+        "output_size_bytes": str(output_size_bytes),
+        "preview_sizes": preview_sizes or "",
+    }
+
+    if get_redis().hset(f"{CACHE_KEY_PREFIX}{key}", mapping=entry):
+        get_redis().incrby(CACHE_BYTES_KEY, output_size_bytes)
+
+    get_redis().zadd(CACHE_LRU_KEY, {key: time.time()})
+
+    evict_conversions(session)
+
+
+def evict_conversions(session: Session):
+    evicted = []
+
+    # Only the index entries are dropped: the output objects stay in the
+    # bucket because finished jobs still reference them.
+    while (
+        get_redis().zcard(CACHE_LRU_KEY) > settings.conversion_cache_max_entries
+        or int(get_redis().get(CACHE_BYTES_KEY) or 0) > settings.conversion_cache_max_bytes
+    ):
+        popped = get_redis().zpopmin(CACHE_LRU_KEY)
+
+        if not popped:
+            break
+
+        key, _ = popped[0]
+        size = get_redis().hget(f"{CACHE_KEY_PREFIX}{key}", "output_size_bytes")
+        get_redis().delete(f"{CACHE_KEY_PREFIX}{key}")
+        get_redis().decrby(CACHE_BYTES_KEY, int(size or 0))
+        evicted.append(key)
+
+    if evicted:
+        session.execute(delete(ConversionCache).where(ConversionCache.key.in_(evicted)))
@@ -1,17 +1,40 @@
 from core.settings import get_settings
 
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
 
 settings = get_settings()
 
-engine = create_engine(
-    url=settings.database_url.unicode_string(),
-    echo=False,
-    future=True,
-    pool_pre_ping=True,
-)
-
-SessionLocal = sessionmaker(bind=engine)
+engine: Engine | None = None
+session_factory: sessionmaker | None = None
 
 Base = declarative_base()
+
+
+def init_db():
+    global engine, session_factory
+
+    # Connections inherited from the parent process must not be reused
+    # by a forked child, so the old pool is dropped without closing them.
+    if engine is not None:
+        engine.dispose(close=False)
+
+    engine = create_engine(
+        url=settings.database_url.unicode_string(),
+        echo=False,
+        future=True,
+        pool_pre_ping=True,
+        pool_size=settings.db_pool_connections,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout_seconds,
+    )
+    # Tasks keep reading the job after committing a transition, which would
+    # otherwise cost a SELECT per attribute access.
+    session_factory = sessionmaker(bind=engine, expire_on_commit=False)
+
+
+def get_session() -> Session:
+    if session_factory is None:
+        init_db()
+    return session_factory()
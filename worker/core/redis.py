@@ -3,4 +3,27 @@ from core.settings import get_settings
 
 settings = get_settings()
 
-redis_client = redis.Redis.from_url(settings.redis_url, decode_responses=True)
\ No newline at end of file
+redis_client: redis.Redis | None = None
+
+
+def init_redis():
+    global redis_client
+
+    if redis_client is not None:
+        redis_client.connection_pool.reset()
+
+    # A blocking pool makes threads wait for a free connection instead of
+    # failing once the pool is exhausted.
+    redis_client = redis.Redis(
+        connection_pool=redis.BlockingConnectionPool.from_url(
+            settings.redis_url,
+            max_connections=settings.redis_pool_connections,
+            decode_responses=True,
+        ),
+    )
+
+
+def get_redis() -> redis.Redis:
+    if redis_client is None:
+        init_redis()
+    return redis_client
@@ -64,6 +64,87 @@ class Settings(BaseSettings):
         "http://api:8000/api/v1",
     )
 
+    conversion_max_memory_bytes: int = int(os.getenv("CONVERSION_MAX_MEMORY_BYTES", 512 * 1024 * 1024))
+    conversion_spool_max_bytes: int = int(os.getenv("CONVERSION_SPOOL_MAX_BYTES", 16 * 1024 * 1024))
+
+    conversion_max_frames: int = int(os.getenv("CONVERSION_MAX_FRAMES", 500))
+
+    # Zero splits the cores between the tasks the worker runs at once.
+    conversion_max_threads: int = int(os.getenv("CONVERSION_MAX_THREADS", 0))
+    conversion_pixels_per_thread: int = int(os.getenv("CONVERSION_PIXELS_PER_THREAD", 4_000_000))
+
+    conversion_small_queue: str = os.getenv("CONVERSION_SMALL_QUEUE", "convert.small")
+    conversion_large_queue: str = os.getenv("CONVERSION_LARGE_QUEUE", "convert.large")
+    conversion_queue_max_priority: int = int(os.getenv("CONVERSION_QUEUE_MAX_PRIORITY", 9))
+
+    worker_queues: str = os.getenv("WORKER_QUEUES", "convert.small,convert.large")
+    worker_concurrency: int = int(os.getenv("WORKER_CONCURRENCY", os.cpu_count() or 1))
+    worker_prefetch_multiplier: int = int(os.getenv("WORKER_PREFETCH_MULTIPLIER", 1))
+    worker_pool: str = os.getenv("WORKER_POOL", "prefork")
+
+    # Zero sizes the pool from the number of tasks one process runs at once.
+    db_pool_size: int = int(os.getenv("DB_POOL_SIZE", 0))
+    db_max_overflow: int = int(os.getenv("DB_MAX_OVERFLOW", 2))
+    db_pool_timeout_seconds: int = int(os.getenv("DB_POOL_TIMEOUT_SECONDS", 30))
+    redis_max_connections: int = int(os.getenv("REDIS_MAX_CONNECTIONS", 0))
+    storage_max_pool_connections: int = int(os.getenv("STORAGE_MAX_POOL_CONNECTIONS", 0))
+
+    user_max_active_jobs: int = int(os.getenv("USER_MAX_ACTIVE_JOBS", 4))
+    user_job_lease_seconds: int = int(os.getenv("USER_JOB_LEASE_SECONDS", 60 * 60))
+
+    job_processing_in_redis: bool = os.getenv("JOB_PROCESSING_IN_REDIS", "false").lower() == "true"
+
+    job_status_ttl_seconds: int = int(os.getenv("JOB_STATUS_TTL_SECONDS", 24 * 60 * 60))
+
+    progress_publish_interval_seconds: float = float(os.getenv("PROGRESS_PUBLISH_INTERVAL_SECONDS", 0.5))
+    progress_throughput_alpha: float = float(os.getenv("PROGRESS_THROUGHPUT_ALPHA", 0.2))
+
+    preview_sizes: str = os.getenv("PREVIEW_SIZES", "128,512")
+    preview_quality: int = int(os.getenv("PREVIEW_QUALITY", 75))
+
+    conversion_cache_enabled: bool = os.getenv("CONVERSION_CACHE_ENABLED", "true").lower() == "true"
+    conversion_cache_max_entries: int = int(os.getenv("CONVERSION_CACHE_MAX_ENTRIES", 100_000))
+    conversion_cache_max_bytes: int = int(os.getenv("CONVERSION_CACHE_MAX_BYTES", 10 * 1024 * 1024 * 1024))
+
+    storage_multipart_threshold_bytes: int = int(os.getenv("STORAGE_MULTIPART_THRESHOLD_BYTES", 16 * 1024 * 1024))
+    storage_multipart_chunk_bytes: int = int(os.getenv("STORAGE_MULTIPART_CHUNK_BYTES", 8 * 1024 * 1024))
+    storage_transfer_concurrency: int = int(os.getenv("STORAGE_TRANSFER_CONCURRENCY", 4))
+
+    @property
+    def process_concurrency(self) -> int:
+        # Prefork children run one task at a time, the other pools run all of
+        # them in the same process.
+        if self.worker_pool in ("prefork", "solo"):
+            return 1
+        return self.worker_concurrency
+
+    @property
+    def conversion_task_threads(self) -> int:
+        # Every concurrent task may fan out at once, so each gets its share
+        # of the cores rather than all of them.
+        return self.conversion_max_threads or max(1, (os.cpu_count() or 1) // self.worker_concurrency)
+
+    @property
+    def db_pool_connections(self) -> int:
+        return self.db_pool_size or self.process_concurrency
+
+    @property
+    def redis_pool_connections(self) -> int:
+        # Progress callbacks publish from the transfer threads as well.
+        return self.redis_max_connections or self.process_concurrency * (self.storage_transfer_concurrency + 1)
+
+    @property
+    def storage_pool_connections(self) -> int:
+        return self.storage_max_pool_connections or self.process_concurrency * (self.storage_transfer_concurrency + 1)
+
+    @property
+    def worker_queue_list(self) -> list[str]:
+        return [queue.strip() for queue in self.worker_queues.split(",") if queue.strip()]
+
+    @property
+    def preview_size_list(self) -> list[int]:
+        return [int(size) for size in self.preview_sizes.split(",") if size.strip()]
+
     class Config:
         env_file = ".env"
 
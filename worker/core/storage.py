@@ -2,21 +2,46 @@ import boto3
 
 from botocore.client import Config
 from core.settings import get_settings
+from boto3.s3.transfer import TransferConfig
 
 settings = get_settings()
 
-storage_client = boto3.client(
-    "s3",
-    endpoint_url=settings.storage_endpoint,
-    aws_access_key_id=settings.storage_access_key,
-    aws_secret_access_key=settings.storage_secret_key,
-    region_name=settings.storage_region,
-    config=Config(signature_version="s3v4"),
+storage_client = None
+
+transfer_config = TransferConfig(
+    multipart_threshold=settings.storage_multipart_threshold_bytes,
+    multipart_chunksize=settings.storage_multipart_chunk_bytes,
+    max_concurrency=settings.storage_transfer_concurrency,
 )
 
+
+def init_storage():
+    global storage_client
+
+    # boto3 clients are safe to share between threads but not across a fork,
+    # so every process builds its own from a fresh session.
+    storage_client = boto3.session.Session().client(
+        "s3",
+        endpoint_url=settings.storage_endpoint,
+        aws_access_key_id=settings.storage_access_key,
+        aws_secret_access_key=settings.storage_secret_key,
+        region_name=settings.storage_region,
+        config=Config(
+            signature_version="s3v4",
+            max_pool_connections=settings.storage_pool_connections,
+        ),
+    )
+
+
+def get_storage_client():
+    if storage_client is None:
+        init_storage()
+    return storage_client
+
+
 def create_bucket_if_not_exists(bucket_name: str):
-    existing_buckets = storage_client.list_buckets()
+    client = get_storage_client()
+    existing_buckets = client.list_buckets()
 
     if not any(bucket['Name'] == bucket_name for bucket in existing_buckets.get('Buckets', [])):
-        storage_client.create_bucket(Bucket=bucket_name)
-
+        client.create_bucket(Bucket=bucket_name)
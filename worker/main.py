@@ -1,4 +1,10 @@
 from celery import Celery
+from kombu import Queue
+from celery.signals import worker_process_init
+
+from core.db import init_db
+from core.redis import init_redis
+from core.storage import init_storage
 from core.settings import get_settings
 
 settings = get_settings()
@@ -9,5 +15,26 @@ celery = Celery(
     include=["tasks"],
 )
 
+# The API declares the same queues, so the priority argument has to match
+# on both sides or RabbitMQ refuses the second declaration.
+conversion_queues = {
+    name: Queue(name, routing_key=name, queue_arguments={"x-max-priority": settings.conversion_queue_max_priority})
+    for name in (settings.conversion_small_queue, settings.conversion_large_queue)
+}
+
 celery.conf.task_acks_late = True
-celery.conf.worker_prefetch_multiplier = 1
+celery.conf.task_queues = [
+    conversion_queues.get(name, Queue(name, routing_key=name))
+    for name in settings.worker_queue_list
+]
+celery.conf.task_default_queue = settings.conversion_small_queue
+celery.conf.worker_concurrency = settings.worker_concurrency
+celery.conf.worker_prefetch_multiplier = settings.worker_prefetch_multiplier
+celery.conf.worker_pool = settings.worker_pool
+
+
+@worker_process_init.connect
+def init_worker_process(**kwargs):
+    init_db()
+    init_redis()
+    init_storage()
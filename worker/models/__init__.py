@@ -1,4 +1,5 @@
 from models.base import (
     Job,
     JobStatus,
+    ConversionCache,
 )
\ No newline at end of file
@@ -2,7 +2,7 @@ import enum
 
 from core.db import Base
 from sqlalchemy.sql import func
-from sqlalchemy import Column, Integer, String, Enum, DateTime
+from sqlalchemy import JSON, Column, Integer, String, Enum, DateTime
 
 
 class JobStatus(str, enum.Enum):
@@ -18,13 +18,33 @@ class Job(Base):
     id = Column(Integer, primary_key=True, index=True)
     filename = Column(String, nullable=False)
     input_path = Column(String, nullable=False)
+    input_sha256 = Column(String(64), nullable=True)
     output_path = Column(String, nullable=True)
     original_format = Column(String, nullable=True)
     input_size_bytes = Column(Integer, nullable=True)
     output_size_bytes = Column(Integer, nullable=True)
+    preview_sizes = Column(String, nullable=True)
+    options = Column(JSON(none_as_null=True), nullable=True)
     target_format = Column(String, nullable=False)
     status = Column(Enum(JobStatus), nullable=False, default=JobStatus.PENDING)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     started_at = Column(DateTime(timezone=True), nullable=True)
     finished_at = Column(DateTime(timezone=True), nullable=True)
+    user_id = Column(Integer, nullable=False)
 
+
+
+class ConversionCache(Base):
+    __tablename__ = "conversion_cache"
+
+    key = Column(String(64), primary_key=True)
+    input_sha256 = Column(String(64), nullable=False)
+    target_format = Column(String, nullable=False)
+    options = Column(String, nullable=False, default="{}")
+    input_path = Column(String, nullable=False)
+    output_path = Column(String, nullable=False)
+    output_size_bytes = Column(Integer, nullable=True)
+    preview_sizes = Column(String, nullable=True)
+    hits = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_used_at = Column(DateTime(timezone=True), server_default=func.now())
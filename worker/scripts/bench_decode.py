@@ -0,0 +1,105 @@
+"""Compare full decode plus resize with draft/reduce decoding.
+
+Writes synthetic JPEG, PNG and TIFF inputs of --megapixels, then downscales
+each to fit --max-side both ways. Every run gets a fresh process so the peak
+RSS reported is that of a single decode (Linux only). Run from the worker
+directory:
+
+    python -m scripts.bench_decode --megapixels 40 --max-side 1024 --runs 3
+"""
+import os
+import time
+import argparse
+import tempfile
+import multiprocessing
+
+from PIL import Image
+from statistics import median
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.image import apply_options, get_target_size, request_draft
+
+FORMATS = {"jpeg": "JPEG", "png": "PNG", "tiff": "TIFF"}
+
+
+def write_input(path: str, save_format: str, megapixels: int):
+    side = int((megapixels * 1_000_000) ** 0.5)
+
+    # Noise over gradients compresses roughly like a photo, unlike a flat
+    # colour, so the encoded sizes stay realistic.
+    img = Image.merge("RGB", (
+        Image.linear_gradient("L").resize((side, side)),
+        Image.effect_noise((side, side), 48),
+        Image.linear_gradient("L").rotate(90).resize((side, side)),
+    ))
+    img.save(path, format=save_format)
+
+
+def get_peak_rss_kb() -> int:
+    # VmHWM starts over at exec, unlike ru_maxrss which a spawned child
+    # inherits from the parent that wrote the inputs.
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1])
+    return 0
+
+
+def decode(path: str, optimized: bool, max_side: int) -> tuple[float, int]:
+    options = {"max_width": max_side, "max_height": max_side}
+    baseline = get_peak_rss_kb()
+    started = time.perf_counter()
+
+    with Image.open(path) as img:
+        if optimized:
+            request_draft(img, options)
+            img.load()
+            output = apply_options(img, options)
+        else:
+            img.load()
+            output = img.resize(get_target_size(img, options), Image.Resampling.LANCZOS)
+
+        output.load()
+
+    elapsed = time.perf_counter() - started
+    peak_kb = get_peak_rss_kb() - baseline
+
+    return elapsed, peak_kb
+
+
+def measure(path: str, optimized: bool, max_side: int, runs: int) -> tuple[float, float]:
+    timings = []
+    peaks = []
+    context = multiprocessing.get_context("spawn")
+
+    for _ in range(runs):
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            elapsed, peak_kb = pool.submit(decode, path, optimized, max_side).result()
+
+        timings.append(elapsed)
+        peaks.append(peak_kb / 1024)
+
+    return median(timings), median(peaks)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--megapixels", type=int, default=40)
+    parser.add_argument("--max-side", type=int, default=1024)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        for ext, save_format in FORMATS.items():
+            path = os.path.join(directory, f"input.{ext}")
+            write_input(path, save_format, args.megapixels)
+
+            print(f"{ext} ({os.path.getsize(path) / (1024 * 1024):.1f} MB on disk)")
+
+            for name, optimized in (("naive", False), ("optimized", True)):
+                elapsed, peak_mb = measure(path, optimized, args.max_side, args.runs)
+                print(f"  {name:<10} median {elapsed * 1000:8.1f} ms   peak +{peak_mb:8.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
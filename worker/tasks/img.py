@@ -1,102 +1,328 @@
 import uuid
-import json
 
-from io import BytesIO
 from PIL import Image
 from main import celery
+from celery.utils.log import get_task_logger
+from sqlalchemy import func, select, update
 from models import Job, JobStatus
 from datetime import datetime, timezone
+from tempfile import SpooledTemporaryFile
 
-from core.db import SessionLocal
-from core.redis import redis_client
+from core.db import get_session
+from core.cache import (
+    hash_file,
+    store_conversion,
+    lookup_conversion,
+    conversion_cache_key,
+)
 from core.settings import get_settings
-from core.storage import storage_client
+from core.storage import get_storage_client, transfer_config
+
+from utils.status import publish_job_status
+from utils.progress import JobProgress
+from utils.scheduling import release_user_slot, renew_user_slot
+from utils.image import (
+    convert_mode,
+    is_animated,
+    request_draft,
+    apply_options,
+    save_animation,
+    check_animation_budget,
+    ANIMATED_FORMATS,
+    get_save_format,
+    get_save_params,
+    get_preview_key,
+    render_previews,
+    check_memory_budget,
+    get_thread_count,
+    conversion_executor,
+)
 
 settings = get_settings()
 
+logger = get_task_logger(__name__)
+
+
+RUNNABLE_STATUSES = (JobStatus.PENDING, JobStatus.PROCESSING)
+
+
+def transition_job(session, job_id: int, **values) -> Job | None:
+    # The status check lives in the WHERE clause, so a redelivered task or a
+    # concurrent worker can never move a finished job, and the row comes back
+    # from the same statement instead of a separate SELECT.
+    job = session.scalars(
+        update(Job)
+        .where(Job.id == job_id, Job.status.in_(RUNNABLE_STATUSES))
+        .values(**values)
+        .returning(Job)
+        .execution_options(populate_existing=True)
+    ).one_or_none()
+
+    session.commit()
+
+    return job
+
+
+def start_job(session, job_id: int) -> Job | None:
+    if settings.job_processing_in_redis:
+        # PROCESSING only reaches the Redis status key and the channels; the
+        # row goes straight from PENDING to its terminal state.
+        job = session.scalars(
+            select(Job).where(Job.id == job_id, Job.status.in_(RUNNABLE_STATUSES))
+        ).one_or_none()
+        session.commit()
+        return job
+
+    return transition_job(
+        session,
+        job_id,
+        status=JobStatus.PROCESSING,
+        started_at=func.now(),
+    )
+
+
+def finish_job(session, job_id: int, started_at: datetime, **values) -> Job | None:
+    return transition_job(
+        session,
+        job_id,
+        started_at=func.coalesce(Job.started_at, started_at),
+        finished_at=func.now(),
+        **values,
+    )
+
+
+def complete_job(
+    session,
+    job: Job,
+    started_at: datetime,
+    input_sha256: str | None,
+    output_path: str,
+    output_size_bytes: int,
+    preview_sizes: str | None,
+) -> dict | None:
+    finished = finish_job(
+        session,
+        job.id,
+        started_at,
+        status=JobStatus.SUCCESS,
+        input_sha256=input_sha256,
+        output_path=output_path,
+        output_size_bytes=output_size_bytes,
+        preview_sizes=preview_sizes or None,
+    )
+
+    # The job was cancelled or finished elsewhere in the meantime, so this
+    # run's result is dropped rather than announced.
+    if finished is None:
+        return None
+
+    publish_job_status(job, {
+        "status": "SUCCESS",
+        "output_path": output_path,
+        "output_size_bytes": output_size_bytes,
+        "savings_bytes": (job.input_size_bytes or 0) - output_size_bytes,
+    })
+
+    return {"output_path": output_path}
+
 
 @celery.task(name="convert_image", bind=True, acks_late=True)
 def convert_image(self, job_id: int):
-    session = SessionLocal()
+    session = get_session()
+    storage_client = get_storage_client()
+    job = None
+    started_at = datetime.now(timezone.utc)
     try:
-        job = session.get(Job, job_id)
+        job = start_job(session, job_id)
         if not job:
-            self.update_state(state="FAILURE", meta={"reason": "job-not-found"})
+            self.update_state(state="FAILURE", meta={"reason": "job-not-runnable"})
             return
 
-        job.status = JobStatus.PROCESSING
-        job.started_at = datetime.now(timezone.utc)
-        session.commit()
+        renew_user_slot(job)
+        publish_job_status(job, {
+            "status": "PROCESSING"
+        })
 
-        redis_client.publish(
-            "jobs_channel",
-            json.dumps({
-                "job_id": job.id,
-                "message": {
-                    "status": "PROCESSING"
-                }
-            })
-        )
+        progress = JobProgress(job)
+        target_ext = job.target_format
+        out_filename = f"{uuid.uuid4().hex}.{target_ext}"
+        cache_key = None
+        input_sha256 = job.input_sha256
+        options = job.options or {}
 
-        response = storage_client.get_object(Bucket="uploads", Key=job.input_path)
-        input_bytes = response['Body'].read()
+        if settings.conversion_cache_enabled and input_sha256:
+            cache_key = conversion_cache_key(input_sha256, target_ext, options)
 
-        img = Image.open(BytesIO(input_bytes))
-        target_ext = job.target_format
-        out_buffer = BytesIO()
+            if cached := lookup_conversion(session, cache_key):
+                return complete_job(
+                    session,
+                    job,
+                    started_at,
+                    input_sha256,
+                    cached["output_path"],
+                    int(cached["output_size_bytes"]),
+                    cached.get("preview_sizes"),
+                )
 
-        if target_ext in ("jpg", "jpeg") and img.mode in ("RGBA", "LA", "P"):
-            img = img.convert("RGB")
+        with (
+            SpooledTemporaryFile(max_size=settings.conversion_spool_max_bytes) as in_file,
+            SpooledTemporaryFile(max_size=settings.conversion_spool_max_bytes) as out_file,
+        ):
+            progress.start_phase("download", job.input_size_bytes)
+            storage_client.download_fileobj(
+                Bucket=settings.storage_upload_bucket,
+                Key=job.input_path,
+                Fileobj=in_file,
+                Config=transfer_config,
+                Callback=progress,
+            )
+            in_file.seek(0)
 
-        img.save(out_buffer, format=target_ext.upper())
-        out_buffer.seek(0)
+            if settings.conversion_cache_enabled and cache_key is None:
+                input_sha256 = hash_file(in_file)
+                cache_key = conversion_cache_key(input_sha256, target_ext, options)
 
-        output_size_bytes = out_buffer.getbuffer().nbytes
+                if cached := lookup_conversion(session, cache_key):
+                    return complete_job(
+                        session,
+                        job,
+                        started_at,
+                        input_sha256,
+                        cached["output_path"],
+                        int(cached["output_size_bytes"]),
+                        cached.get("preview_sizes"),
+                    )
 
-        out_filename = f"{uuid.uuid4().hex}.{target_ext}"
-        storage_client.put_object(
-            Bucket=settings.storage_converted_bucket,
-            Key=out_filename,
-            Body=out_buffer,
-            ContentType=f"image/{target_ext}"
-        )
+            with Image.open(in_file) as img:
+                save_format = get_save_format(target_ext)
+                animated = is_animated(img) and save_format in ANIMATED_FORMATS
 
-        job.output_path = out_filename
-        job.output_size_bytes = output_size_bytes
-        job.status = JobStatus.SUCCESS
-        job.finished_at = datetime.now(timezone.utc)
+                if animated:
+                    check_animation_budget(img, save_format, options)
 
-        session.commit()
+                # After draft the reported size is the reduced one, so the
+                # budget covers what is actually decoded.
+                request_draft(img, options)
+                check_memory_budget(img, target_ext)
 
-        redis_client.publish(
-            "jobs_channel",
-            json.dumps({
-                "job_id": job.id,
-                "message": {
-                    "status": "SUCCESS",
-                    "output_path": out_filename
-                }
-            })
+                progress.start_phase("decode")
+                img.load()
+
+                if animated:
+                    # Previews come from the first frame, before the encoder
+                    # moves the source to the last one.
+                    previews = render_previews(img, settings.preview_size_list)
+                    progress.start_phase("encode")
+                    save_animation(
+                        img,
+                        out_file,
+                        save_format,
+                        options,
+                        get_save_params(img, save_format, options),
+                    )
+                else:
+                    prepared = apply_options(img, options)
+
+                    if prepared is not img:
+                        # Frees the full-resolution pixels now instead of when
+                        # the with block exits.
+                        img.close()
+                        img = prepared
+
+                    if target_ext in ("jpg", "jpeg") and img.mode in ("RGBA", "LA", "P"):
+                        img = convert_mode(img, "RGB")
+
+                    save_params = get_save_params(img, save_format, options)
+                    progress.start_phase("encode")
+
+                    if get_thread_count(img) > 1:
+                        # Previews are cut from the decoded pixels while the
+                        # output is encoded on this thread.
+                        previews_future = conversion_executor.submit(
+                            render_previews, img, settings.preview_size_list,
+                        )
+                        img.save(out_file, format=save_format, **save_params)
+                        previews = previews_future.result()
+                    else:
+                        img.save(out_file, format=save_format, **save_params)
+                        # The pixels are already decoded at this point, so previews
+                        # are cut from the same image instead of decoding again.
+                        previews = render_previews(img, settings.preview_size_list)
+
+            output_size_bytes = out_file.tell()
+            out_file.seek(0)
+
+            progress.start_phase("upload", output_size_bytes)
+            storage_client.upload_fileobj(
+                Fileobj=out_file,
+                Bucket=settings.storage_converted_bucket,
+                Key=out_filename,
+                ExtraArgs={"ContentType": Image.MIME.get(save_format, f"image/{target_ext}")},
+                Config=transfer_config,
+                Callback=progress,
+            )
+
+        for size, preview in previews.items():
+            storage_client.put_object(
+                Bucket=settings.storage_converted_bucket,
+                Key=get_preview_key(out_filename, size),
+                Body=preview,
+                ContentType="image/webp",
+            )
+
+        preview_sizes = ",".join(str(size) for size in sorted(previews))
+        progress.finish()
+
+        result = complete_job(
+            session,
+            job,
+            started_at,
+            input_sha256,
+            out_filename,
+            output_size_bytes,
+            preview_sizes,
         )
 
-        return {"output_path": out_filename}
+        # SUCCESS is already committed and published by now, so a failure to
+        # index the output only costs a future cache hit.
+        if result and cache_key:
+            try:
+                store_conversion(
+                    session,
+                    key=cache_key,
+                    input_sha256=input_sha256,
+                    target_format=target_ext,
+                    options=options,
+                    input_path=job.input_path,
+                    output_path=out_filename,
+                    output_size_bytes=output_size_bytes,
+                    preview_sizes=preview_sizes,
+                )
+                session.commit()
+            except Exception:
+                session.rollback()
+                logger.exception("Failed to cache the conversion of job %s", job_id)
+
+        return result
 
     except Exception as exc:
         session.rollback()
-        job.status = JobStatus.FAILED
-        job.finished_at = datetime.now(timezone.utc)
-        session.commit()
-        redis_client.publish(
-            "jobs_channel",
-            json.dumps({
-                "job_id": job.id,
-                "message": {
-                    "status": "FAILED",
-                    "reason": str(exc)
-                }
+        if not job:
+            raise
+        if finish_job(session, job_id, started_at, status=JobStatus.FAILED):
+            publish_job_status(job, {
+                "status": "FAILED",
+                "reason": str(exc)
             })
-        )
         raise
     finally:
+        # A parked job that could not be handed the slot is re-parked and
+        # the lease expires on its own, so neither the task's result nor the
+        # conversion error depends on this.
+        if job:
+            try:
+                release_user_slot(job)
+            except Exception:
+                logger.exception("Failed to release the scheduling slot of job %s", job_id)
         session.close()
 
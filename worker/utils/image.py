@@ -0,0 +1,302 @@
+from io import BytesIO
+from math import ceil
+from PIL import ExifTags, Image, ImageOps, ImageSequence
+from typing import IO, Dict, List
+from core.settings import get_settings
+from concurrent.futures import ThreadPoolExecutor
+
+settings = get_settings()
+
+# Pillow releases the GIL inside convert, resize and the codec loops, so
+# threads give real parallelism without pickling pixels to other processes.
+conversion_executor = ThreadPoolExecutor(
+    max_workers=settings.conversion_task_threads * settings.process_concurrency,
+    thread_name_prefix="convert",
+)
+
+
+def get_save_format(ext: str) -> str:
+    return Image.registered_extensions().get(f".{ext}", ext.upper())
+
+
+def check_memory_budget(img: Image.Image, target_ext: str):
+    # Image.open only parses the header, so size and mode are known before
+    # any pixel data is decoded.
+    decoded_bytes = img.width * img.height * len(img.getbands())
+
+    if target_ext in ("jpg", "jpeg") and img.mode in ("RGBA", "LA", "P"):
+        decoded_bytes += img.width * img.height * 3
+
+    budget = settings.conversion_max_memory_bytes - 2 * settings.conversion_spool_max_bytes
+
+    if decoded_bytes > budget:
+        raise MemoryError(
+            f"Decoding {img.width}x{img.height} {img.mode} needs ~{decoded_bytes} bytes, "
+            f"budget is {budget} bytes"
+        )
+
+
+def get_thread_count(img: Image.Image) -> int:
+    return max(
+        1,
+        min(
+            settings.conversion_task_threads,
+            (img.width * img.height) // settings.conversion_pixels_per_thread,
+        ),
+    )
+
+
+def convert_mode(img: Image.Image, mode: str) -> Image.Image:
+    threads = get_thread_count(img)
+
+    if threads == 1:
+        return img.convert(mode)
+
+    img.load()
+    output = Image.new(mode, img.size)
+
+    # More strips than threads keeps the per-strip copies small and the
+    # threads busy when some strips convert faster than others.
+    strip_height = ceil(img.height / (threads * 4))
+    boxes = [
+        (0, top, img.width, min(top + strip_height, img.height))
+        for top in range(0, img.height, strip_height)
+    ]
+
+    def convert_strip(box):
+        return box, img.crop(box).convert(mode)
+
+    for box, strip in conversion_executor.map(convert_strip, boxes):
+        output.paste(strip, box[:2])
+
+    output.info = {key: value for key, value in img.info.items() if key != "transparency"}
+
+    return output
+
+
+ANIMATED_FORMATS = ("GIF", "WEBP", "PNG")
+
+SAVE_OPTIONS = {
+    "JPEG": ("quality", "optimize", "progressive"),
+    "WEBP": ("quality", "lossless"),
+    "PNG": ("optimize", "compress_level"),
+    "GIF": ("optimize",),
+}
+
+METADATA_FORMATS = ("JPEG", "WEBP", "PNG", "TIFF")
+
+# Below this ratio between the reduced and the target size the final
+# resample is left to LANCZOS, matching Pillow's own reducing_gap.
+REDUCING_GAP = 3.0
+
+
+def get_target_size(img: Image.Image, options: dict) -> tuple[int, int] | None:
+    max_width = options.get("max_width") or img.width
+    max_height = options.get("max_height") or img.height
+    scale = min(max_width / img.width, max_height / img.height)
+
+    if scale >= 1:
+        return None
+
+    return max(1, round(img.width * scale)), max(1, round(img.height * scale))
+
+
+def request_draft(img: Image.Image, options: dict):
+    # JPEG decodes straight to 1/2, 1/4 or 1/8 scale in the DCT, so a big
+    # downscale never materialises the full-resolution pixels. Must be
+    # called before the image is loaded.
+    if img.format != "JPEG":
+        return
+
+    if options.get("strip_metadata") and img.getexif().get(ExifTags.Base.Orientation, 1) in (5, 6, 7, 8):
+        # The pixels are turned a quarter before resizing, so the box is too.
+        options = {**options, "max_width": options.get("max_height"), "max_height": options.get("max_width")}
+
+    if size := get_target_size(img, options):
+        img.draft(None, size)
+
+
+def resize_to_options(img: Image.Image, options: dict) -> Image.Image:
+    if size := get_target_size(img, options):
+        # Palette and bilevel images only support nearest neighbour resampling.
+        if img.mode in ("1", "P"):
+            img = img.convert("RGBA" if "transparency" in img.info else "RGB")
+
+        # reduce() box-averages by an integer factor, which is far cheaper
+        # than LANCZOS over the full image and leaves less for it to cover.
+        factor = int(min(img.width / size[0], img.height / size[1]) / REDUCING_GAP)
+
+        if factor > 1:
+            img = img.reduce(factor)
+
+        img = resize(img, size)
+
+    return img
+
+
+def resize(img: Image.Image, size: tuple[int, int]) -> Image.Image:
+    threads = get_thread_count(img)
+
+    if threads == 1:
+        return img.resize(size, Image.Resampling.LANCZOS)
+
+    img.load()
+    output = Image.new(img.mode, size)
+    width, height = size
+    scale = img.height / height
+
+    # resize() samples outside the box wherever the filter reaches, so the
+    # strips join without seams and match a single resize to within rounding.
+    strip_height = ceil(height / (threads * 4))
+
+    def resize_strip(top):
+        bottom = min(top + strip_height, height)
+        box = (0, top * scale, img.width, bottom * scale)
+        return top, img.resize((width, bottom - top), Image.Resampling.LANCZOS, box=box)
+
+    for top, strip in conversion_executor.map(resize_strip, range(0, height, strip_height)):
+        output.paste(strip, (0, top))
+
+    output.info = dict(img.info)
+
+    return output
+
+
+def apply_options(img: Image.Image, options: dict) -> Image.Image:
+    # Once EXIF is dropped viewers can no longer rotate the image, so the
+    # orientation is baked into the pixels first.
+    if options.get("strip_metadata") and img.getexif().get(ExifTags.Base.Orientation, 1) != 1:
+        ImageOps.exif_transpose(img, in_place=True)
+
+    return resize_to_options(img, options)
+
+
+def is_animated(img: Image.Image) -> bool:
+    return getattr(img, "n_frames", 1) > 1
+
+
+def check_animation_budget(img: Image.Image, save_format: str, options: dict):
+    frames = img.n_frames
+
+    if frames > settings.conversion_max_frames:
+        raise ValueError(f"Animation has {frames} frames, the limit is {settings.conversion_max_frames}")
+
+    target_size = get_target_size(img, options)
+    width, height = target_size or img.size
+
+    # Frames kept until the end: GIF holds palettised copies, APNG our RGBA
+    # frames plus its own copies, and WebP nothing when it can read the
+    # source frame by frame, otherwise the prepared frames handed to it.
+    if save_format == "WEBP" and target_size is None:
+        held_bytes = 0
+    elif save_format == "GIF":
+        held_bytes = frames * width * height
+    elif save_format == "PNG":
+        held_bytes = frames * width * height * 4 * 2
+    else:
+        held_bytes = frames * width * height * 4
+
+    # The current source frame and its converted copy.
+    decoded_bytes = img.width * img.height * 4 * 2
+    budget = settings.conversion_max_memory_bytes - 2 * settings.conversion_spool_max_bytes
+
+    if held_bytes + decoded_bytes > budget:
+        raise MemoryError(
+            f"Converting {frames} frames of {img.width}x{img.height} to {save_format} needs "
+            f"~{held_bytes + decoded_bytes} bytes, budget is {budget} bytes"
+        )
+
+
+def iter_frames(img: Image.Image, save_format: str, options: dict):
+    for frame in ImageSequence.Iterator(img):
+        prepared = resize_to_options(frame, options)
+
+        # Seeking reuses the source image, so every frame needs its own copy.
+        if prepared is frame:
+            prepared = frame.copy()
+
+        # GIF frames can each carry their own palette, APNG frames share the
+        # first frame's mode.
+        if save_format == "PNG" and prepared.mode not in ("RGB", "RGBA"):
+            prepared = prepared.convert("RGBA")
+
+        yield prepared
+
+
+def save_animation(img: Image.Image, fp: IO[bytes], save_format: str, options: dict, params: dict):
+    params = {**params, "save_all": True, "loop": img.info.get("loop", 0)}
+
+    if save_format == "WEBP" and get_target_size(img, options) is None:
+        # The WebP encoder seeks through the source itself and encodes each
+        # frame as it goes, so only the durations are collected up front.
+        durations = [frame.info.get("duration", 0) for frame in ImageSequence.Iterator(img)]
+        img.seek(0)
+        img.save(fp, format=save_format, duration=durations, **params)
+        return
+
+    frames = iter_frames(img, save_format, options)
+    first = next(frames)
+
+    if save_format == "GIF":
+        # The GIF encoder reads each frame's duration and pulls the frames
+        # from the generator one at a time.
+        rest = frames
+    else:
+        # WebP and APNG walk append_images more than once, so they need a list.
+        rest = list(frames)
+        params["duration"] = [frame.info.get("duration", 0) for frame in [first, *rest]]
+
+    first.save(fp, format=save_format, append_images=rest, **params)
+
+
+def get_save_params(img: Image.Image, save_format: str, options: dict) -> dict:
+    params = {key: options[key] for key in SAVE_OPTIONS.get(save_format, ()) if key in options}
+
+    if save_format not in METADATA_FORMATS or options.get("strip_metadata") is None:
+        return params
+
+    if options["strip_metadata"]:
+        params["exif"] = b""
+        params["icc_profile"] = None
+        if save_format == "JPEG":
+            params["comment"] = b""
+    else:
+        # Most encoders only write metadata that is passed to save explicitly.
+        if exif := img.getexif():
+            params["exif"] = exif.tobytes()
+        if icc_profile := img.info.get("icc_profile"):
+            params["icc_profile"] = icc_profile
+
+    return params
+
+
+def get_preview_key(output_path: str, size: int) -> str:
+    return f"previews/{output_path.rsplit('.', 1)[0]}/{size}.webp"
+
+
+def render_previews(img: Image.Image, sizes: List[int]) -> Dict[int, BytesIO]:
+    previews = {}
+    rendition = img
+
+    if rendition.mode not in ("RGB", "RGBA"):
+        has_alpha = "A" in rendition.getbands() or "transparency" in rendition.info
+        rendition = rendition.convert("RGBA" if has_alpha else "RGB")
+
+    # Largest first, each rendition is resized from the previous one so only
+    # the first step touches the full-resolution pixels.
+    for size in sorted(sizes, reverse=True):
+        scale = size / max(rendition.size)
+
+        if scale < 1:
+            rendition = rendition.resize(
+                (max(1, round(rendition.width * scale)), max(1, round(rendition.height * scale))),
+                Image.Resampling.LANCZOS,
+                reducing_gap=3.0,
+            )
+
+        buffer = BytesIO()
+        rendition.save(buffer, format="WEBP", quality=settings.preview_quality, method=4)
+        buffer.seek(0)
+        previews[size] = buffer
+
+    return previews
@@ -0,0 +1,87 @@
+import time
+import threading
+
+from models import Job
+from core.redis import get_redis
+from core.settings import get_settings
+from utils.status import publish_job_progress
+
+settings = get_settings()
+
+THROUGHPUT_KEY = "conversion_throughput"
+
+
+def get_format_pair(job: Job) -> str:
+    return f"{(job.original_format or '').lower()}:{job.target_format.lower()}"
+
+
+def get_throughput(job: Job) -> float | None:
+    value = get_redis().hget(THROUGHPUT_KEY, get_format_pair(job))
+    return float(value) if value else None
+
+
+def record_throughput(job: Job, input_bytes: int, elapsed_seconds: float):
+    if not input_bytes or elapsed_seconds <= 0:
+        return
+
+    sample = input_bytes / elapsed_seconds
+    previous = get_throughput(job)
+    alpha = settings.progress_throughput_alpha
+    value = sample if previous is None else alpha * sample + (1 - alpha) * previous
+
+    get_redis().hset(THROUGHPUT_KEY, get_format_pair(job), value)
+
+
+class JobProgress:
+    """Publishes rate limited phase and byte progress for a running job.
+
+    The boto3 transfer callbacks fire from the transfer threads, once per
+    read chunk, so updates are folded under a lock and only published when
+    the phase changes or the publish interval has passed.
+    """
+
+    def __init__(self, job: Job):
+        self.job = job
+        self.lock = threading.Lock()
+        self.started = time.monotonic()
+        self.last_published = 0.0
+        self.phase: str | None = None
+        self.bytes = 0
+        self.total_bytes: int | None = None
+        self.throughput = get_throughput(job)
+
+    def get_eta_seconds(self) -> float | None:
+        if not self.throughput or not self.job.input_size_bytes:
+            return None
+
+        expected = self.job.input_size_bytes / self.throughput
+        return round(max(0.0, expected - (time.monotonic() - self.started)), 1)
+
+    def publish(self):
+        message = {
+            "status": "PROCESSING",
+            "phase": self.phase,
+            "bytes": self.bytes,
+            "total_bytes": self.total_bytes,
+            "eta_seconds": self.get_eta_seconds(),
+        }
+
+        self.last_published = time.monotonic()
+        publish_job_progress(self.job, message)
+
+    def start_phase(self, phase: str, total_bytes: int | None = None):
+        with self.lock:
+            self.phase = phase
+            self.bytes = 0
+            self.total_bytes = total_bytes
+            self.publish()
+
+    def __call__(self, bytes_transferred: int):
+        with self.lock:
+            self.bytes += bytes_transferred
+
+            if time.monotonic() - self.last_published >= settings.progress_publish_interval_seconds:
+                self.publish()
+
+    def finish(self):
+        record_throughput(self.job, self.job.input_size_bytes, time.monotonic() - self.started)
@@ -0,0 +1,109 @@
+import json
+
+from models import Job
+from main import celery, conversion_queues
+from core.redis import get_redis
+from core.settings import get_settings
+
+settings = get_settings()
+
+JOB_LEASES_PREFIX = "user_job_leases:"
+PARKED_JOBS_PREFIX = "user_parked_jobs:"
+PARKED_USERS_KEY = "scheduling_parked_users"
+
+# Drops the finished job's lease along with any that have expired, then
+# leases the freed slots to the user's parked jobs in order. Mirrors the
+# promotion the API runs on admit; the entries returned are dispatched here.
+RELEASE_SCRIPT = """
+local user_id = ARGV[1]
+local limit = tonumber(ARGV[2])
+local lease = tonumber(ARGV[3])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local dispatch = {}
+
+redis.call('ZREM', KEYS[1], ARGV[4])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+
+while redis.call('ZCARD', KEYS[1]) < limit do
+    local entry = redis.call('LPOP', KEYS[2])
+    if not entry then
+        break
+    end
+    redis.call('ZADD', KEYS[1], now + lease, cjson.decode(entry)['job_id'])
+    table.insert(dispatch, entry)
+end
+
+if redis.call('EXISTS', KEYS[2]) == 0 then
+    redis.call('SREM', KEYS[3], user_id)
+end
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    redis.call('EXPIRE', KEYS[1], math.ceil(lease))
+end
+
+return dispatch
+"""
+
+# A job can sit in the broker for a while before it starts, so its lease is
+# renewed once it is actually running.
+RENEW_SCRIPT = """
+local time = redis.call('TIME')
+redis.call('ZADD', KEYS[1], tonumber(time[1]) + tonumber(ARGV[2]), ARGV[1])
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+"""
+
+# Puts entries that could not be dispatched back at the head of the parked
+# list, in order, and drops their leases.
+REPARK_SCRIPT = """
+for i = #ARGV, 2, -1 do
+    redis.call('LPUSH', KEYS[2], ARGV[i])
+    redis.call('ZREM', KEYS[1], cjson.decode(ARGV[i])['job_id'])
+end
+
+redis.call('SADD', KEYS[3], ARGV[1])
+"""
+
+
+def get_scheduling_keys(user_id: int) -> tuple[str, str, str]:
+    return f"{JOB_LEASES_PREFIX}{user_id}", f"{PARKED_JOBS_PREFIX}{user_id}", PARKED_USERS_KEY
+
+
+def renew_user_slot(job: Job):
+    get_redis().eval(
+        RENEW_SCRIPT,
+        1,
+        f"{JOB_LEASES_PREFIX}{job.user_id}",
+        job.id,
+        settings.user_job_lease_seconds,
+    )
+
+
+def release_user_slot(job: Job):
+    r = get_redis()
+    keys = get_scheduling_keys(job.user_id)
+
+    admitted = r.eval(
+        RELEASE_SCRIPT,
+        len(keys),
+        *keys,
+        job.user_id,
+        settings.user_max_active_jobs,
+        settings.user_job_lease_seconds,
+        job.id,
+    )
+
+    for index, parked in enumerate(admitted):
+        entry = json.loads(parked)
+        job_id = entry.pop("job_id")
+
+        # Passing the declared Queue rather than its name keeps the priority
+        # argument on the declaration, even when this worker does not consume
+        # from the queue the parked job was routed to.
+        queue = entry.pop("queue")
+        entry["queue"] = conversion_queues.get(queue, queue)
+
+        try:
+            celery.send_task("convert_image", args=[job_id], **entry)
+        except Exception:
+            r.eval(REPARK_SCRIPT, len(keys), *keys, job.user_id, *admitted[index:])
+            raise
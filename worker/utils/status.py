@@ -0,0 +1,44 @@
+import json
+
+from models import Job
+from datetime import datetime, timezone
+from core.redis import get_redis
+from core.settings import get_settings
+
+settings = get_settings()
+
+JOB_STATUS_PREFIX = "job_status:"
+JOB_CHANNEL_PREFIX = "jobs_channel:"
+USER_CHANNEL_PREFIX = "user_jobs_channel:"
+
+
+def publish_job_status(job: Job, message: dict):
+    pipe = get_redis().pipeline(transaction=False)
+
+    # The latest status is also kept under a key per job so pollers can read
+    # it from Redis instead of Postgres.
+    pipe.set(
+        f"{JOB_STATUS_PREFIX}{job.id}",
+        json.dumps({
+            "id": job.id,
+            "user_id": job.user_id,
+            "status": message["status"],
+            "output_path": job.output_path,
+            "output_size_bytes": job.output_size_bytes,
+            "updated_at": datetime.now(timezone.utc).isoformat(),
+        }),
+        ex=settings.job_status_ttl_seconds,
+    )
+
+    pipe.publish(f"{JOB_CHANNEL_PREFIX}{job.id}", json.dumps(message))
+    pipe.publish(f"{USER_CHANNEL_PREFIX}{job.user_id}", json.dumps({"job_id": job.id, **message}))
+    pipe.execute()
+
+
+def publish_job_progress(job: Job, message: dict):
+    # Progress is transient, so unlike publish_job_status it leaves the
+    # cached status key alone and only reaches live subscribers.
+    pipe = get_redis().pipeline(transaction=False)
+    pipe.publish(f"{JOB_CHANNEL_PREFIX}{job.id}", json.dumps(message))
+    pipe.publish(f"{USER_CHANNEL_PREFIX}{job.user_id}", json.dumps({"job_id": job.id, **message}))
+    pipe.execute()